@@ -1,5 +1,6 @@
 import pygame
-from queue import PriorityQueue
+from openset import OpenSet
+from grid import EMPTY, BARRIER, START, END, OPEN, CLOSED, PATH
 
 pygame.init()
 win = pygame.display.set_mode((800,800))
@@ -14,72 +15,77 @@ PURPLE = (128, 0, 128) # for the start
 GREY = (128, 128, 128) # grid lines
 TURQUOISE = (64, 224, 208) # for the end
 
-class Spot:
-    def __init__(self, row, col, width, totalRows):
+PALETTE = [WHITE, BLACK, PURPLE, TURQUOISE, GREEN, RED, YELLOW] # color of each state code, only looked up when drawing
+
+class Spot: # a view of one cell: its state is a byte in the states array every spot of the grid shares
+    __slots__ = ("row", "col", "idx", "grid", "states") # no per-spot __dict__ and no neighbor list
+
+    def __init__(self, row, col, totalRows, grid, states):
         self.row = row
         self.col = col
-        self.x = row  * width
-        self.y = col * width
-        self.color = WHITE
-        self.neighbors = []
-        self.width = width
-        self.totalRows = totalRows
+        self.idx = row * totalRows + col
+        self.grid = grid
+        self.states = states
     
     def getPos(self):
         return self.row, self.col 
     
     def isClosed(self):
-        return self.color == RED
+        return self.states[self.idx] == CLOSED
 
     def isOpen(self):
-        return self.color == GREEN
+        return self.states[self.idx] == OPEN
     
     def isBarrier(self):
-        return self.color == BLACK
+        return self.states[self.idx] == BARRIER
     
     def isStart(self):
-        return self.color == PURPLE
+        return self.states[self.idx] == START
     
     def isEnd(self):
-        return self.color == TURQUOISE
+        return self.states[self.idx] == END
     
     def reset(self):
-        self.color = WHITE
+        self.states[self.idx] = EMPTY
     
     def makeClosed(self):
-        self.color = RED
+        self.states[self.idx] = CLOSED
 
     def makeOpen(self):
-        self.color = GREEN
+        self.states[self.idx] = OPEN
     
     def makeBarrier(self):
-        self.color = BLACK
+        self.states[self.idx] = BARRIER
     
     def makeStart(self):
-        self.color = PURPLE
+        self.states[self.idx] = START
     
     def makeEnd(self):
-        self.color = TURQUOISE
+        self.states[self.idx] = END
     
     def makePath(self):
-        self.color = YELLOW
+        self.states[self.idx] = PATH
 
-    def draw(self, win):
-        pygame.draw.rect(win, self.color, (self.x, self.y, self.width, self.width))
+    def draw(self, win, width):
+        pygame.draw.rect(win, PALETTE[self.states[self.idx]], (self.row * width, self.col * width, width, width))
 
-    def updateNeighbors(self, grid): # every single node needs a valid neighbor (not barriers)
-        self.neighbors = []
-        if self.row < self.totalRows - 1 and not grid[self.row + 1][self.col].isBarrier(): # moving down 
-            self.neighbors.append(grid[self.row + 1][self.col])
+    @property
+    def neighbors(self): # worked out when asked, so barrier edits never leave a stale list behind
+        grid, states, row, col, idx = self.grid, self.states, self.row, self.col, self.idx
+        totalRows = len(grid)
+        neighbors = []
+        if row < totalRows - 1 and states[idx + totalRows] != BARRIER: # moving down 
+            neighbors.append(grid[row + 1][col])
 
-        if self.row > 0 and not grid[self.row - 1][self.col].isBarrier(): # moving up
-            self.neighbors.append(grid[self.row - 1][self.col])
+        if row > 0 and states[idx - totalRows] != BARRIER: # moving up
+            neighbors.append(grid[row - 1][col])
 
-        if self.col < self.totalRows - 1 and not grid[self.row][self.col + 1].isBarrier(): # moving right
-            self.neighbors.append(grid[self.row][self.col + 1])
+        if col < totalRows - 1 and states[idx + 1] != BARRIER: # moving right
+            neighbors.append(grid[row][col + 1])
 
-        if self.col > 0 and not grid[self.row][self.col - 1].isBarrier(): # moving left
-            self.neighbors.append(grid[self.row][self.col - 1])
+        if col > 0 and states[idx - 1] != BARRIER: # moving left
+            neighbors.append(grid[row][col - 1])
+        return neighbors
 
     def __lt__(self, other): # the other spot is always greater than this spot
         return False    
@@ -100,9 +106,7 @@ def reconstructPath(cameFrom, current, draw):
         draw()
 
 def algorithm(draw, grid, start, end):
-    count = 0
-    openSet = PriorityQueue() # efficient way to always get the smallest element out of it
-    openSet.put((0, count, start)) # add the start node with its f score into the open set (adding count to implement fifo)
+    openSet = OpenSet() # heap that always gives back the node with the smallest f score (ties are fifo)
     cameFrom = {} # keeping track of the path, which node came before the one i am currently in 
     
     # stores the path from the start node to the current node
@@ -112,17 +116,15 @@ def algorithm(draw, grid, start, end):
     # keep score of our predicted distance to the end node
     fScore = {spot: float("inf") for row in grid for spot in row} 
     fScore[start] = h(start.getPos(), end.getPos()) # initial estimate of how far the start node is from the end node
+    openSet.push(start, fScore[start])
 
-    openSetHash = {start}
-
-    while not openSet.empty():
+    while openSet:
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 pygame.quit()
                 return False
         
-        current = openSet.get()[2] # just the node
-        openSetHash.remove(current)
+        current = openSet.pop()
 
         if current == end:
             reconstructPath(cameFrom, end, draw)
@@ -135,11 +137,9 @@ def algorithm(draw, grid, start, end):
                 cameFrom[neighbor] =  current
                 gScore[neighbor] = tempGScore 
                 fScore[neighbor] = tempGScore + h(neighbor.getPos(), end.getPos())
-                if neighbor not in openSetHash:
-                    count += 1
-                    openSet.put((fScore[neighbor], count, neighbor)) # now we are going to consider this neighbor cause it has a better path than before
-                    openSetHash.add(neighbor)
+                if neighbor not in openSet:
                     neighbor.makeOpen() # opening it so we consider it
+                openSet.push(neighbor, fScore[neighbor]) # (re)queue it with its better score, the old entry goes stale
         
         draw()
 
@@ -150,14 +150,14 @@ def algorithm(draw, grid, start, end):
 
 def makeGrid(rows, width):
     grid = []
-    gap = width // rows
+    states = bytearray(rows * rows) # one state code per cell, all EMPTY
 
     for row in range(rows):
         grid.append([])
         for col in range(rows):
-            spot = Spot(row, col, gap, rows)
+            spot = Spot(row, col, rows, grid, states)
             grid[row].append(spot)
-    
+
     return grid
 
 def drawGrid(win, rows, width):
@@ -171,9 +171,10 @@ def drawGrid(win, rows, width):
 def draw(win, grid, rows, width):
     win.fill(WHITE)
 
+    gap = width // rows
     for row in grid:
         for spot in row:
-            spot.draw(win)
+            spot.draw(win, gap)
 
     drawGrid(win, rows, width)
     pygame.display.update()
@@ -229,9 +230,6 @@ def main(win, width):
 
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_SPACE and not started:
-                    for row in grid:
-                        for spot in row:
-                            spot.updateNeighbors(grid)
                     algorithm(lambda: draw(win, grid, rows, width), grid, start, end) # lambda! anonymous functions
                 if event.key == pygame.K_c:
                     start = None
@@ -0,0 +1,103 @@
+"""Batch queries for many agents on one map: one start to many ends, and many (start, end) pairs.
+
+``oneToMany`` grows a single shortest-path tree (``querycache.PathTree``) from the
+start and stops once every reachable end is settled; ends in another region are
+answered by the connected-region index and never searched for.
+
+``manyToMany`` groups the pairs by start and hands the groups to worker processes.
+The grid is copied once into a ``multiprocessing.shared_memory`` block that every
+worker maps read-only, so the layout is never pickled per task.
+
+Both return a ``BatchResult``: costs in an ``array('i')`` (-1 when unreachable) and
+every path back to back in one flat ``array('i')`` of cell indices, cut by offsets.
+"""
+
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+from grid import Grid
+from components import connected
+from querycache import PathTree
+from solver import shareGrid
+
+UNREACHABLE = -1
+
+
+class BatchResult:
+    def __init__(self, costs, offsets, cells):
+        self.costs = costs  # total step cost per query, UNREACHABLE if there is no path
+        self.offsets = offsets  # path i is cells[offsets[i]:offsets[i + 1]]
+        self.cells = cells
+
+    def __len__(self): return len(self.costs)
+
+    def cost(self, i):
+        return self.costs[i] if self.costs[i] != UNREACHABLE else None
+
+    def path(self, i):
+        """Flat indices from start to end for query ``i``, empty when unreachable."""
+        return self.cells[self.offsets[i]:self.offsets[i + 1]]
+
+
+def oneToMany(grid, start, ends):
+    """Answer ``start`` -> each of ``ends`` (flat indices) from one Dijkstra tree, in ``ends`` order."""
+    reachable = {end for end in ends if connected(grid, start, end)}
+    tree = PathTree(grid, start, reachable)
+    costs, offsets, cells = array("i"), array("q", [0]), array("i")
+    for end in ends:
+        path = tree.path(end) if end in reachable else []
+        costs.append(tree.distance(end) if path else UNREACHABLE)
+        cells.extend(path)
+        offsets.append(len(cells))
+    return BatchResult(costs, offsets, cells)
+
+
+# === WORKERS ===
+workerMemory = workerGrid = None  # per worker process: the attached block and the grid over it
+
+def attach(name, width, height, weighted):
+    global workerMemory, workerGrid
+    workerMemory = shared_memory.SharedMemory(name=name)
+    size = width * height
+    buffer = workerMemory.buf.toreadonly()
+    workerGrid = Grid(width, height, buffer[:size], buffer[size:2 * size] if weighted else None)
+
+def answerGroup(group, grid=None):
+    start, ends = group
+    result = oneToMany(grid if grid is not None else workerGrid, start, ends)
+    return result.costs, result.offsets, result.cells
+
+
+def manyToMany(grid, pairs, workers=None):
+    """Answer every ``(start, end)`` pair of flat indices, in order, using ``workers`` processes."""
+    groups = {}  # start -> positions in pairs, so each start grows one tree
+    for i, (start, _) in enumerate(pairs):
+        groups.setdefault(start, []).append(i)
+    tasks = [(start, [pairs[i][1] for i in positions]) for start, positions in groups.items()]
+    workers = min(workers or os.cpu_count() or 1, len(tasks))
+
+    if workers <= 1:
+        answers = [answerGroup(task, grid) for task in tasks]
+    else:
+        memory, key = shareGrid(grid)
+        try:
+            with ProcessPoolExecutor(workers, initializer=attach, initargs=key) as pool:
+                answers = list(pool.map(answerGroup, tasks, chunksize=max(1, len(tasks) // (workers * 4))))
+        finally:
+            memory.close()
+            memory.unlink()
+
+    costs = array("i", [UNREACHABLE]) * len(pairs)
+    spans = [None] * len(pairs)  # (answer, index within its group)
+    for positions, answer in zip(groups.values(), answers):
+        for j, i in enumerate(positions):
+            costs[i] = answer[0][j]
+            spans[i] = (answer, j)
+    offsets, cells = array("q", [0]), array("i")
+    for (_, groupOffsets, groupCells), j in spans:
+        cells.extend(groupCells[groupOffsets[j]:groupOffsets[j + 1]])
+        offsets.append(len(cells))
+    return BatchResult(costs, offsets, cells)
+
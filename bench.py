@@ -0,0 +1,243 @@
+"""Reproducible, headless benchmark for every search registered in ``solver.ALGORITHMS``.
+
+    python bench.py                                   # default maps and sizes, table output
+    python bench.py --sizes 50 1024 4096 --maps open maze --json results.json
+    python bench.py --baseline results.json           # exit 1 on a throughput/expansion regression
+    python bench.py --regions --sizes 1024 4096       # exit 1 on a wrong answer, or a query after a wall edit costing much more than a rebuild
+
+Maps are generated from ``--seed``, so the same arguments always search the same
+grids. Each case runs in a fresh worker process, which keeps peak RSS per case honest.
+"""
+
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+import solver
+from grid import Grid, EMPTY, BARRIER
+from components import Components, connected
+from search import run, dijkstra
+
+DENSITIES = (10, 20, 30)  # percent of cells blocked in the random* maps
+TERRAIN_COSTS = (1, 1, 1, 2, 3, 5, 9)  # step costs drawn for the terrain map
+REGION_SLOWDOWN = 2  # a query after a wall edit may cost this many index rebuilds
+REGION_TRIALS, REGION_EDITS = 2000, 20  # randomized edit sequences checked against real searches
+
+
+# === MAP GENERATORS ===
+def openField(width, height, rng):
+    return Grid(width, height)
+
+def randomObstacles(width, height, rng, density):
+    cells = bytearray(BARRIER if rng.random() < density else EMPTY for _ in range(width * height))
+    return Grid(width, height, cells)
+
+def recursiveDivision(width, height, rng):
+    """Maze by recursive division: walls on odd rows/columns, doors on even ones."""
+    grid = Grid(width, height)
+    chambers = [(0, height - 1, 0, width - 1)]  # inclusive row / col ranges, split iteratively
+    while chambers:
+        r0, r1, c0, c1 = chambers.pop()
+        if r1 - r0 < 2 and c1 - c0 < 2: continue
+        horizontal = r1 - r0 > c1 - c0 if r1 - r0 != c1 - c0 else rng.random() < 0.5
+        if horizontal and r1 - r0 >= 2:
+            wall = rng.randrange(r0 + 1, r1, 2)
+            door = rng.randrange(c0, c1 + 1, 2)
+            for col in range(c0, c1 + 1):
+                if col != door: grid.setBarrier(wall, col)
+            chambers += [(r0, wall - 1, c0, c1), (wall + 1, r1, c0, c1)]
+        elif c1 - c0 >= 2:
+            wall = rng.randrange(c0 + 1, c1, 2)
+            door = rng.randrange(r0, r1 + 1, 2)
+            for row in range(r0, r1 + 1):
+                if row != door: grid.setBarrier(row, wall)
+            chambers += [(r0, r1, c0, wall - 1), (r0, r1, wall + 1, c1)]
+    return grid
+
+def roomsAndCorridors(width, height, rng):
+    """Rectangular rooms carved out of solid rock, chained by L-shaped corridors."""
+    grid = Grid(width, height, bytearray([BARRIER]) * (width * height))
+    rooms = []
+    for _ in range(max(4, width * height // 400)):
+        h, w = rng.randint(3, max(3, height // 8)), rng.randint(3, max(3, width // 8))
+        top, left = rng.randrange(0, height - h + 1), rng.randrange(0, width - w + 1)
+        for row in range(top, top + h):
+            grid.cells[row * width + left:row * width + left + w] = bytes(w)
+        rooms.append((top + h // 2, left + w // 2))
+    rooms.sort(key=lambda room: room[0] + room[1])
+    for (r0, c0), (r1, c1) in zip(rooms, rooms[1:]):
+        for col in range(min(c0, c1), max(c0, c1) + 1): grid.setBarrier(r0, col, False)
+        for row in range(min(r0, r1), max(r0, r1) + 1): grid.setBarrier(row, c1, False)
+    return grid
+
+def weightedTerrain(width, height, rng):
+    """Sparse walls over ground of mixed step costs."""
+    grid = randomObstacles(width, height, rng, 0.1)
+    weights = bytearray(rng.choice(TERRAIN_COSTS) for _ in range(width * height))
+    return Grid(width, height, grid.cells, weights)
+
+MAPS = {
+    "open": openField,
+    **{f"random{d}": partial(randomObstacles, density=d / 100) for d in DENSITIES},
+    "maze": recursiveDivision,
+    "rooms": roomsAndCorridors,
+    "terrain": weightedTerrain,
+}
+
+
+def makeCase(mapName, size, seed):
+    """The seeded grid for a case plus its query: first and last free cell in row-major order."""
+    rng = random.Random(f"{seed}:{mapName}:{size}")
+    grid = MAPS[mapName](size, size, rng)
+    if mapName.startswith("random") or mapName == "terrain":  # keep the corners usable
+        grid.setBarrier(0, 0, False)
+        grid.setBarrier(size - 1, size - 1, False)
+    start = bytes(grid.cells).index(EMPTY)
+    end = bytes(grid.cells).rindex(EMPTY)
+    return grid, grid.pos(start), grid.pos(end)
+
+
+def peakRss():
+    if resource is None: return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 1024 if sys.platform != "darwin" else rss / 1024 ** 2  # MiB (KiB on Linux, bytes on macOS)
+
+
+def runCase(mapName, size, algorithm, seed):
+    grid, start, end = makeCase(mapName, size, seed)
+    result = solver.solve(grid, start, end, algorithm, prune=False)  # time the search, not the region index
+    stats = result.stats
+    return {
+        "map": mapName, "size": size, "algorithm": algorithm,
+        "expanded": stats["expanded"],
+        "nodesPerSec": stats["expanded"] / stats["time"] if stats["time"] else None,
+        "peakOpen": stats.get("peakOpen"),
+        "peakRssMiB": peakRss(),
+        "pathLength": result.length,
+        "time": stats["time"],
+    }
+
+
+def runAll(maps, sizes, algorithms, seed):
+    results = []
+    # one fresh process per case so peak RSS is not inherited from earlier cases
+    with ProcessPoolExecutor(max_workers=1, max_tasks_per_child=1) as pool:
+        for size in sizes:
+            for mapName in maps:
+                for algorithm in algorithms:
+                    record = pool.submit(runCase, mapName, size, algorithm, seed).result()
+                    results.append(record)
+                    print(formatRow(record), flush=True)
+    return results
+
+
+COLUMNS = (("map", 9, "{}"), ("size", 6, "{}"), ("algorithm", 10, "{}"), ("expanded", 11, "{}"),
+           ("nodesPerSec", 12, "{:.0f}"), ("peakOpen", 9, "{}"), ("peakRssMiB", 11, "{:.1f}"),
+           ("pathLength", 11, "{}"), ("time", 9, "{:.4f}"))
+
+def formatRow(record):
+    cells = [(fmt.format(record[key]) if record[key] is not None else "-").rjust(width) for key, width, fmt in COLUMNS]
+    return " ".join(cells)
+
+
+def findRegressions(results, baseline, tolerance):
+    previous = {(r["map"], r["size"], r["algorithm"]): r for r in baseline["results"]}
+    problems = []
+    for record in results:
+        old = previous.get((record["map"], record["size"], record["algorithm"]))
+        if old is None: continue
+        label = f"{record['map']} {record['size']} {record['algorithm']}"
+        if old["nodesPerSec"] and (record["nodesPerSec"] or 0) < old["nodesPerSec"] * (1 - tolerance):
+            problems.append(f"{label}: {record['nodesPerSec']:.0f} nodes/s, baseline {old['nodesPerSec']:.0f}")
+        if record["expanded"] > old["expanded"] * (1 + tolerance):
+            problems.append(f"{label}: expanded {record['expanded']}, baseline {old['expanded']}")
+    return problems
+
+
+# === REGION INDEX ===
+def regionCheck(size):
+    """Seconds to build the region index of an open size x size grid, and to answer a query after one wall."""
+    grid = Grid(size, size)
+    t = time.perf_counter()
+    index = Components(grid)
+    build = time.perf_counter() - t
+    grid.setBarrier(size // 2, size // 2)  # free on every side, so its region is marked dirty
+    t = time.perf_counter()
+    index.connected(0, size * size - 1)
+    return build, time.perf_counter() - t
+
+
+def regionMismatches(seed, size=8):
+    """Edit small random grids, querying after every edit; lists each answer a search contradicts."""
+    rng = random.Random(f"{seed}:regions")
+    problems = []
+    for trial in range(REGION_TRIALS):
+        grid = randomObstacles(size, size, rng, 0.3)
+        for _ in range(REGION_EDITS):
+            grid.setBarrier(rng.randrange(size), rng.randrange(size), rng.random() < 0.6)
+            a, b = rng.randrange(size * size), rng.randrange(size * size)
+            free = not (grid.isBarrier(a) or grid.isBarrier(b))
+            expected = a == b or free and bool(run(dijkstra(grid, a, b)).path)
+            if connected(grid, a, b) != expected:
+                problems.append(f"regions: trial {trial} says {a} and {b} are {'not ' * expected}connected")
+    return problems
+
+
+def checkRegions(sizes, seed):
+    problems = regionMismatches(seed)
+    print(f"regions: {REGION_TRIALS} edit sequences, {len(problems)} wrong answers", flush=True)
+    for size in sizes:
+        build, query = regionCheck(size)
+        print(f"regions {size}: build {build:.4f}s, wall + query {query:.4f}s", flush=True)
+        if query > build * REGION_SLOWDOWN + 0.001:
+            problems.append(f"regions {size}: wall + query {query:.4f}s, build {build:.4f}s")
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--maps", nargs="+", choices=list(MAPS), default=list(MAPS))
+    parser.add_argument("--sizes", nargs="+", type=int, default=[50, 256, 1024],
+                        help="square grid sides, e.g. 50 256 1024 4096")
+    parser.add_argument("--algorithms", nargs="+", choices=list(solver.ALGORITHMS), default=list(solver.ALGORITHMS))
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", metavar="PATH", help="also write the results as JSON")
+    parser.add_argument("--baseline", metavar="PATH", help="JSON from an earlier run to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative slowdown (default 0.2)")
+    parser.add_argument("--regions", action="store_true", help="only check the region index's cost after a wall edit")
+    args = parser.parse_args(argv)
+
+    if args.regions:
+        problems = checkRegions(args.sizes, args.seed)
+        for problem in problems:
+            print("REGRESSION", problem)
+        return 1 if problems else 0
+
+    print(" ".join(key.rjust(width) for key, width, _ in COLUMNS))
+    results = runAll(args.maps, args.sizes, args.algorithms, args.seed)
+    report = {"seed": args.seed, "python": platform.python_version(), "machine": platform.machine(), "results": results}
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            problems = findRegressions(results, json.load(f), args.tolerance)
+        for problem in problems:
+            print("REGRESSION", problem)
+        return 1 if problems else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
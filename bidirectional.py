@@ -0,0 +1,102 @@
+"""Bidirectional Dijkstra and A*: one frontier grows from ``start``, another from ``end``.
+
+Each step expands the side with the smaller open set. Whenever a relaxed cell
+already has a distance from the other side, the two half-paths through it give a
+candidate route; the best one found so far costs ``best``.
+
+The A* variant orders both sides by the average potential
+``p(v) = (h_end(v) - h_start(v)) / 2`` (forward) and ``-p(v)`` (backward), with
+Manhattan distances for ``h``. That is Dijkstra on consistent reduced edge costs,
+so the usual bidirectional Dijkstra rule stays exact: stop once the two smallest
+open keys add up to ``best`` or more. Keys are doubled to stay integral.
+
+On weighted grids an edge costs the weight of the cell it enters, so the backward
+side, which walks edges in reverse, pays for the cell it expands rather than the
+one it relaxes. Costs are at least 1, which keeps the potentials consistent.
+
+The backward half is traced with ``OPEN_BACK`` / ``CLOSED_BACK``.
+"""
+
+from grid import OPEN, CLOSED, PATH, OPEN_BACK, CLOSED_BACK
+from openset import OpenSet
+from search import SearchResult, workspace, buildPath
+
+
+class Side:
+    """Open set plus score buffers for one direction of the search."""
+
+    def __init__(self, grid, slot, origin, target, openState, closedState):
+        ws = workspace(grid, slot)
+        self.gen, self.g, self.parent, self.stamp = ws.begin(), ws.g, ws.parent, ws.stamp
+        self.targetRow, self.targetCol = divmod(target, grid.width)
+        self.originRow, self.originCol = divmod(origin, grid.width)
+        self.openState, self.closedState = openState, closedState
+        self.openSet = OpenSet()
+        self.expanded = self.relaxations = 0
+        self.other = None
+        self.g[origin], self.parent[origin], self.stamp[origin] = 0, -1, self.gen
+
+    def seen(self, idx): return self.stamp[idx] == self.gen
+
+    def potential(self, idx, width):
+        # twice this side's average potential: Manhattan distance to the target minus to the origin
+        row, col = divmod(idx, width)
+        return abs(row - self.targetRow) + abs(col - self.targetCol) - abs(row - self.originRow) - abs(col - self.originCol)
+
+
+def bidirectional(grid, start, end, useH, trace=False):
+    if grid.isBarrier(start) or grid.isBarrier(end):  # neither side may grow out of a wall
+        return SearchResult([], {"expanded": 0, "relaxations": 0})
+    width, weights = grid.width, grid.weights
+    forward = Side(grid, 0, start, end, OPEN, CLOSED)
+    backward = Side(grid, 1, end, start, OPEN_BACK, CLOSED_BACK)
+    forward.other, backward.other = backward, forward
+    for side, origin in ((forward, start), (backward, end)):
+        side.openSet.push(origin, side.potential(origin, width) if useH else 0)
+
+    best, meet = (0, start) if start == end else (float("inf"), -1)
+    while forward.openSet and backward.openSet:
+        if forward.openSet.peek() + backward.openSet.peek() >= 2 * best: break
+
+        side = forward if len(forward.openSet) <= len(backward.openSet) else backward
+        other, g, parent, stamp, gen = side.other, side.g, side.parent, side.stamp, side.gen
+        current = side.openSet.pop()
+        side.expanded += 1
+        # forward edges cost the neighbour's weight; backward ones (neighbour -> current) cost current's
+        entering = weights if side is forward else None
+        step = weights[current] if weights is not None and side is backward else 1
+        for neighbor in grid.neighbors(current):
+            tempG = g[current] + (entering[neighbor] if entering is not None else step)
+            seen = stamp[neighbor] == gen
+            if seen and tempG >= g[neighbor]: continue
+            if trace and not seen:
+                yield neighbor, side.openState
+            side.relaxations += 1
+            g[neighbor], parent[neighbor], stamp[neighbor] = tempG, current, gen
+            side.openSet.push(neighbor, 2 * tempG + side.potential(neighbor, width) if useH else 2 * tempG)
+            if other.seen(neighbor) and tempG + other.g[neighbor] < best:
+                best, meet = tempG + other.g[neighbor], neighbor
+        if trace:
+            yield current, side.closedState
+
+    stats = {"expanded": forward.expanded + backward.expanded,
+             "expandedForward": forward.expanded, "expandedBackward": backward.expanded,
+             "relaxations": forward.relaxations + backward.relaxations}
+    for key, value in forward.openSet.stats().items():
+        stats[key] = value + backward.openSet.stats()[key]
+    if meet < 0:
+        return SearchResult([], stats)
+
+    path = buildPath(forward.parent, meet)
+    idx = meet
+    while backward.parent[idx] >= 0:  # backward parents lead from the meeting cell to end
+        idx = backward.parent[idx]
+        path.append(idx)
+    if trace:
+        for idx in path[1:-1]:
+            yield idx, PATH
+    return SearchResult(path, stats)
+
+
+def biDijkstra(grid, start, end, trace=False): return bidirectional(grid, start, end, False, trace)
+def biAstar(grid, start, end, trace=False): return bidirectional(grid, start, end, True, trace)
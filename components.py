@@ -0,0 +1,121 @@
+"""Connected-region index: is ``end`` reachable from ``start`` at all?
+
+Every free cell carries a label; labels are joined in a union-find, so two cells
+are connected exactly when their labels share a root. The index is built from
+horizontal runs of free cells (one label per run, unioned with the overlapping runs
+of the row above) and then kept current from ``Grid.edits``:
+
+* a cell that opens up gets a fresh label, unioned with its free neighbours;
+* a cell that gets walled may split its region, so that region's root is marked
+  dirty. A query that lands in a dirty region rebuilds the whole index from runs
+  again, which costs far less than flooding the region cell by cell.
+
+Use ``connected(grid, a, b)``; the index is cached in ``grid.scratch``.
+"""
+
+import re
+from array import array
+
+FREE_RUN = re.compile(rb"[^\x01]+")  # maximal runs of non-BARRIER bytes
+
+
+class Components:
+    def __init__(self, grid):
+        self.grid = grid
+        self.build()
+
+    def build(self):
+        # label every run of free cells and union the runs that touch across rows
+        grid = self.grid
+        self.seen = grid.watch()
+        self.label = array("i", [-1]) * (grid.width * grid.height)
+        self.parent = []  # union-find over labels
+        self.dirty = set()  # roots whose region may have been split
+        width, cells, label, parent = grid.width, grid.cells, self.label, self.parent
+        above = []
+        for row in range(grid.height):
+            base, runs = row * width, []
+            for match in FREE_RUN.finditer(bytes(cells[base:base + width])):
+                start, end = match.span()
+                new = len(parent)
+                parent.append(new)
+                label[base + start:base + end] = array("i", [new]) * (end - start)
+                runs.append((start, end, new))
+            i = 0
+            for start, end, new in runs:  # union with every run above that overlaps this one
+                while i < len(above) and above[i][1] <= start: i += 1
+                j = i
+                while j < len(above) and above[j][0] < end:
+                    self.union(new, above[j][2])
+                    j += 1
+            above = runs
+
+    def find(self, x):
+        parent = self.parent
+        root = x
+        while parent[root] != root: root = parent[root]
+        while parent[x] != root: parent[x], x = root, parent[x]
+        return root
+
+    def union(self, a, b):
+        a, b = self.find(a), self.find(b)
+        if a == b: return a
+        if a > b: a, b = b, a
+        self.parent[b] = a
+        if b in self.dirty:
+            self.dirty.discard(b)
+            self.dirty.add(a)
+        return a
+
+    def fresh(self):
+        self.parent.append(len(self.parent))
+        return len(self.parent) - 1
+
+    def adjacent(self, idx):
+        width = self.grid.width
+        row, col = divmod(idx, width)
+        if row > 0: yield idx - width
+        if row < self.grid.height - 1: yield idx + width
+        if col > 0: yield idx - 1
+        if col < width - 1: yield idx + 1
+
+    def applyEdits(self):
+        grid, label = self.grid, self.label
+        edits = grid.edits
+        for idx in edits[self.seen:]:
+            blocked = grid.isBarrier(idx)
+            if blocked and label[idx] >= 0:
+                root = self.find(label[idx])
+                label[idx] = -1
+                # a dead end cannot split anything; count neighbours by label, as they were before this batch
+                if sum(label[n] >= 0 for n in self.adjacent(idx)) > 1:
+                    self.dirty.add(root)
+            elif not blocked and label[idx] < 0:
+                label[idx] = new = self.fresh()
+                for neighbor in grid.neighbors(idx):
+                    if label[neighbor] >= 0:  # else it opened up later in the journal and joins then
+                        new = self.union(new, label[neighbor])
+        self.seen = len(edits)
+
+    def region(self, idx):
+        """Root label of ``idx``'s region, or -1 for a barrier; may be stale while that root is dirty."""
+        return self.find(self.label[idx]) if self.label[idx] >= 0 else -1
+
+    def connected(self, a, b):
+        self.applyEdits()
+        if self.dirty and (self.region(a) in self.dirty or self.region(b) in self.dirty):
+            self.build()  # renumbers every label, so both roots are taken after it
+        ra = self.region(a)
+        return ra >= 0 and ra == self.region(b)
+
+
+def components(grid):
+    index = grid.scratch.get("components")
+    if index is None or len(index.label) != grid.width * grid.height:
+        index = grid.scratch["components"] = Components(grid)
+    return index
+
+
+def connected(grid, a, b):
+    """True if flat indices ``a`` and ``b`` are free cells joined by a path of free cells."""
+    return a == b or components(grid).connected(a, b)
@@ -1,6 +1,7 @@
 import pygame
 import time
-from queue import PriorityQueue
+from openset import OpenSet
+from grid import EMPTY, BARRIER, START, END, OPEN, CLOSED, PATH
 
 pygame.init()
 WINDOW_WIDTH, GRID_HEIGHT, HEADER_HEIGHT = 800, 780, 70
@@ -21,42 +22,48 @@ ALGORITHMS = {
     "A*": {"key": pygame.K_2, "h": True},
 }
 
+# colors are looked up by state code only when drawing
+PALETTE = [WHITE, BLACK, PURPLE, TURQUOISE, GREEN, RED, YELLOW]
+
 class Spot:
-    def __init__(self, row, col, cellSize, totalRows):
-        self.row = row
-        self.col = col
-        self.x = col * cellSize
-        self.y = row * cellSize + HEADER_HEIGHT
-        self.color = WHITE
-        self.neighbors = []
-        self.cellSize = cellSize
-        self.totalRows = totalRows
+    """A view of one cell; its state is a byte in the ``states`` array the whole grid shares."""
+    __slots__ = ("row", "col", "idx", "grid", "states")
+
+    def __init__(self, row, col, totalRows, grid, states):
+        self.row, self.col = row, col
+        self.idx = row * totalRows + col
+        self.grid, self.states = grid, states
 
     def getPos(self): return self.row, self.col
-    def isClosed(self): return self.color == RED
-    def isOpen(self): return self.color == GREEN
-    def isBarrier(self): return self.color == BLACK
-    def isStart(self): return self.color == PURPLE
-    def isEnd(self): return self.color == TURQUOISE
-    def reset(self): self.color = WHITE
-    def makeClosed(self): self.color = RED
-    def makeOpen(self): self.color = GREEN
-    def makeBarrier(self): self.color = BLACK
-    def makeStart(self): self.color = PURPLE
-    def makeEnd(self): self.color = TURQUOISE
-    def makePath(self): self.color = YELLOW
-
-    def draw(self, win):
-        pygame.draw.rect(win, self.color, (self.x, self.y, self.cellSize, self.cellSize))
-
-    def updateNeighbors(self, grid):
-        self.neighbors = []
-        if self.row < self.totalRows - 1 and not grid[self.row+1][self.col].isBarrier(): self.neighbors.append(grid[self.row+1][self.col])
-        if self.row > 0 and not grid[self.row-1][self.col].isBarrier(): self.neighbors.append(grid[self.row-1][self.col])
-        if self.col < self.totalRows - 1 and not grid[self.row][self.col+1].isBarrier(): self.neighbors.append(grid[self.row][self.col+1])
-        if self.col > 0 and not grid[self.row][self.col-1].isBarrier(): self.neighbors.append(grid[self.row][self.col-1])
-    
-    def __lt__(self): return False
+    def isClosed(self): return self.states[self.idx] == CLOSED
+    def isOpen(self): return self.states[self.idx] == OPEN
+    def isBarrier(self): return self.states[self.idx] == BARRIER
+    def isStart(self): return self.states[self.idx] == START
+    def isEnd(self): return self.states[self.idx] == END
+    def reset(self): self.states[self.idx] = EMPTY
+    def makeClosed(self): self.states[self.idx] = CLOSED
+    def makeOpen(self): self.states[self.idx] = OPEN
+    def makeBarrier(self): self.states[self.idx] = BARRIER
+    def makeStart(self): self.states[self.idx] = START
+    def makeEnd(self): self.states[self.idx] = END
+    def makePath(self): self.states[self.idx] = PATH
+
+    def draw(self, win, cellSize):
+        rect = (self.col * cellSize, self.row * cellSize + HEADER_HEIGHT, cellSize, cellSize)
+        pygame.draw.rect(win, PALETTE[self.states[self.idx]], rect)
+
+    @property
+    def neighbors(self):
+        # read off the shared states when asked, so edits never leave a stale list behind
+        grid, states, row, col, idx = self.grid, self.states, self.row, self.col, self.idx
+        rows, neighbors = len(grid), []
+        if row < rows - 1 and states[idx + rows] != BARRIER: neighbors.append(grid[row+1][col])
+        if row > 0 and states[idx - rows] != BARRIER: neighbors.append(grid[row-1][col])
+        if col < rows - 1 and states[idx + 1] != BARRIER: neighbors.append(grid[row][col+1])
+        if col > 0 and states[idx - 1] != BARRIER: neighbors.append(grid[row][col-1])
+        return neighbors
+
+    def __lt__(self, other): return False
 
 def h(p1, p2): return abs(p1[0] - p2[0]) + abs(p1[1] - p2[1])
 
@@ -68,22 +75,20 @@ def reconstructPath(cameFrom, current, draw):
         draw()
 
 def runAlgorithm(draw, grid, start, end, useH):
-    count, openSet = 0, PriorityQueue()
-    openSet.put((0, count, start))
+    openSet = OpenSet()
     cameFrom = {}
     gScore = {spot: float("inf") for row in grid for spot in row}
     fScore = {spot: float("inf") for row in grid for spot in row}
     gScore[start] = 0
     fScore[start] = h(start.getPos(), end.getPos()) if useH else 0
-    openSetHash = {start}
+    openSet.push(start, fScore[start])
 
-    while not openSet.empty():
+    while openSet:
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 pygame.quit()
                 quit()
-        current = openSet.get()[2]
-        openSetHash.remove(current)
+        current = openSet.pop()
 
         if current == end:
             reconstructPath(cameFrom, end, draw)
@@ -96,19 +101,18 @@ def runAlgorithm(draw, grid, start, end, useH):
                 cameFrom[neighbor] = current
                 gScore[neighbor] = tempG
                 fScore[neighbor] = tempG + (h(neighbor.getPos(), end.getPos()) if useH else 0)
-                if neighbor not in openSetHash:
-                    count += 1
-                    openSet.put((fScore[neighbor], count, neighbor))
-                    openSetHash.add(neighbor)
+                if neighbor not in openSet:
                     neighbor.makeOpen()
+                openSet.push(neighbor, fScore[neighbor])  # re-pushes with the better score if already open
         draw()
         if current != start:
             current.makeClosed()
     return False
 
 def makeGrid(rows, width):
-    size = width // rows
-    return [[Spot(i, j, size, rows) for j in range(rows)] for i in range(rows)]
+    grid, states = [], bytearray(rows * rows)  # one state code per cell, all EMPTY
+    grid.extend([Spot(i, j, rows, grid, states) for j in range(rows)] for i in range(rows))
+    return grid
 
 def drawGrid(win, rows, width):
     size = width // rows
@@ -134,9 +138,10 @@ def drawHeader(win, selection, times):
 def draw(win, grid, headerSel, headerTimes):
     win.fill(WHITE)
     drawHeader(win, headerSel, headerTimes)
+    size = WINDOW_WIDTH // ROWS
     for row in grid:
         for spot in row:
-            spot.draw(win)
+            spot.draw(win, size)
     drawGrid(win, ROWS, WINDOW_WIDTH)
     pygame.display.update()
 
@@ -189,18 +194,12 @@ def main():
 
             if event.type == pygame.KEYDOWN and start and end:
                 clearSearch(grid)
-                for rowList in grid:
-                    for spot in rowList:
-                        spot.updateNeighbors(grid)
 
                 if event.key == pygame.K_3:
                     algoSelection = "Compare"
                     for name, config in ALGORITHMS.items():
                         clearSearch(grid)
                         start.makeStart(); end.makeEnd()
-                        for rowList in grid:
-                            for spot in rowList:
-                                spot.updateNeighbors(grid)
                         t0 = time.time()
                         runAlgorithm(lambda: draw(win, grid, algoSelection, times), grid, start, end, config["h"])
                         times[name.lower()] = round(time.time() - t0, 4)
@@ -0,0 +1,144 @@
+"""D* Lite: incremental replanning that survives grid edits and a moving start.
+
+The planner searches backward from ``end`` and keeps, for every cell, ``g`` (its
+settled distance to ``end``) and ``rhs`` (the one-step lookahead through its best
+neighbour). A cell is queued only while the two disagree. It lives in
+``grid.scratch`` between runs: the next run with the same ``end`` reads the cells
+edited since (``Grid.edits``), re-queues just those and their neighbours, and
+repairs from there instead of starting over. A new start only shifts the key
+offset ``km``. Same generator interface as ``search.bestFirst``.
+"""
+
+from array import array
+
+from grid import OPEN, CLOSED, PATH
+from openset import OpenSet
+from search import SearchResult
+
+INF = 0x7FFFFFFF
+
+
+class Planner:
+    def __init__(self, grid, start, end):
+        size = grid.width * grid.height
+        self.grid, self.start, self.end = grid, start, end
+        self.g = array("i", [INF]) * size
+        self.rhs = array("i", [INF]) * size
+        self.km = 0
+        self.openSet = OpenSet()
+        self.seen = grid.watch()  # journal position already accounted for
+        self.rhs[end] = 0
+        self.openSet.push(end, (self.h(end), 0))
+
+    def h(self, idx):
+        # Manhattan distance to the start; steps cost at least 1, so it never overestimates
+        width = self.grid.width
+        return abs(idx // width - self.start // width) + abs(idx % width - self.start % width)
+
+    def key(self, idx):
+        best = min(self.g[idx], self.rhs[idx])
+        return (best + self.h(idx) + self.km, best)
+
+    def stepCost(self, idx):
+        weights = self.grid.weights
+        return weights[idx] if weights is not None else 1
+
+    def update(self, idx):
+        g, rhs, grid = self.g, self.rhs, self.grid
+        if idx != self.end:
+            best = INF
+            if not grid.isBarrier(idx):
+                for neighbor in grid.neighbors(idx):
+                    if g[neighbor] != INF:
+                        best = min(best, g[neighbor] + self.stepCost(neighbor))
+            rhs[idx] = best
+        self.openSet.discard(idx)
+        if g[idx] != rhs[idx]:
+            self.openSet.push(idx, self.key(idx))
+
+    def moveStart(self, start):
+        if start != self.start:
+            self.km += self.h(start)  # h still measures from the old start here
+            self.start = start
+
+    def applyEdits(self):
+        edits = self.grid.edits
+        changed = set(edits[self.seen:])
+        self.seen = len(edits)
+        for idx in changed:
+            self.update(idx)
+            for neighbor in self.grid.neighbors(idx):
+                self.update(neighbor)
+        return len(changed)
+
+    def computePath(self, trace):
+        """Settle cells until the start's distance is final; yields trace events, returns (expanded, relaxations)."""
+        g, rhs, openSet, start, end, grid = self.g, self.rhs, self.openSet, self.start, self.end, self.grid
+        width, weights, km = grid.width, grid.weights, self.km
+        startRow, startCol = divmod(start, width)
+        expanded = relaxations = 0
+        while openSet and (openSet.peek() < self.key(start) or rhs[start] != g[start]):
+            oldKey = openSet.peek()
+            idx = openSet.pop()
+            newKey = self.key(idx)
+            if oldKey < newKey:  # km grew since it was queued
+                openSet.push(idx, newKey)
+                continue
+            expanded += 1
+            if g[idx] > rhs[idx]:
+                # overconsistent: settle it, and neighbours can only get cheaper through it
+                g[idx] = best = rhs[idx]
+                best += weights[idx] if weights is not None else 1
+                for neighbor in grid.neighbors(idx):
+                    if trace and g[neighbor] == INF and neighbor not in openSet:
+                        yield neighbor, OPEN
+                    if neighbor == end or best >= rhs[neighbor]: continue
+                    relaxations += 1
+                    rhs[neighbor] = best
+                    openSet.discard(neighbor)
+                    if g[neighbor] != best:
+                        row, col = divmod(neighbor, width)
+                        openSet.push(neighbor, (best + abs(row - startRow) + abs(col - startCol) + km, best))
+            else:
+                # underconsistent: it got more expensive, so recompute it and everything it fed
+                g[idx] = INF
+                self.update(idx)
+                for neighbor in grid.neighbors(idx):
+                    self.update(neighbor)
+            if trace and not grid.isBarrier(idx):  # new walls get expanded too, to invalidate what they fed
+                yield idx, CLOSED
+        return expanded, relaxations
+
+    def path(self):
+        # walk downhill from the start: each step enters the neighbour with the smallest cost-to-go
+        g, idx, path = self.g, self.start, [self.start]
+        if g[idx] == INF: return []
+        while idx != self.end:
+            idx = min(self.grid.neighbors(idx), key=lambda n: g[n] + self.stepCost(n) if g[n] != INF else INF)
+            path.append(idx)
+        return path
+
+
+def dstarLite(grid, start, end, trace=False):
+    planner = grid.scratch.get("dstar")
+    reused = planner is not None and planner.end == end and len(planner.g) == grid.width * grid.height
+    if reused:
+        planner.moveStart(start)
+        repaired = planner.applyEdits()
+    else:
+        planner = grid.scratch["dstar"] = Planner(grid, start, end)
+        repaired = 0
+    before = planner.openSet.stats()
+    try:
+        expanded, relaxations = yield from planner.computePath(trace)
+    except GeneratorExit:  # abandoned mid-expansion: the next run must not resume from a half-updated plan
+        del grid.scratch["dstar"]
+        raise
+
+    path = planner.path()
+    if trace:
+        for idx in reversed(path[1:-1]):
+            yield idx, PATH
+    stats = {key: value - before[key] for key, value in planner.openSet.stats().items()}
+    stats.update(expanded=expanded, relaxations=relaxations, reused=reused, editsApplied=repaired, peakOpen=planner.openSet.peak)
+    return SearchResult(path, stats)
@@ -0,0 +1,69 @@
+"""Compact, replayable record of a search's trace events.
+
+An ``EventLog`` holds the ``(cell, state)`` pairs a search yields with ``trace=True``,
+packed into an ``array('i')`` of flat indices and a ``bytearray`` of states. ``before``
+adds, per event, the state the cell had just before it (``BARE`` when the search had
+not touched the cell yet), so playback can step backward as cheaply as forward.
+
+Logs save to a small binary file: a header with the grid size, start, end, event
+count and algorithm name, then the cells and the states. ``before`` is never stored.
+"""
+
+import struct
+import sys
+from array import array
+
+MAGIC = b"PFLOG"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<5sBIIiiIH")  # magic, version, width, height, start, end, events, name length
+BARE = 0xFF  # the cell's state before the search touched it, whatever the board shows there
+
+
+class EventLog:
+    def __init__(self, cells, states, width, height, start, end, algorithm=""):
+        self.cells, self.states = cells, states
+        self.width, self.height = width, height
+        self.start, self.end, self.algorithm = start, end, algorithm
+        self.prior = None
+
+    def __len__(self): return len(self.cells)
+
+    @property
+    def before(self):
+        """The state each event's cell had just before it; built on first use (only going backward needs it)."""
+        if self.prior is None:
+            prior, states = bytearray(len(self.cells)), self.states
+            last = bytearray([BARE]) * (self.width * self.height)
+            for i, idx in enumerate(self.cells):
+                prior[i] = last[idx]
+                last[idx] = states[i]
+            self.prior = prior
+        return self.prior
+
+    def save(self, path):
+        name = self.algorithm.encode()
+        cells = self.cells
+        if sys.byteorder == "big":  # the file is little-endian
+            cells = array("i", cells)
+            cells.byteswap()
+        with open(path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, FORMAT_VERSION, self.width, self.height, self.start, self.end, len(self), len(name)))
+            f.write(name)
+            f.write(cells)
+            f.write(self.states)
+
+
+def load(path):
+    with open(path, "rb") as f:
+        data = f.read()
+    magic, version, width, height, start, end, count, nameLength = HEADER.unpack_from(data)
+    if magic != MAGIC or version != FORMAT_VERSION:
+        raise ValueError(f"{path} is not an event log (or a newer version)")
+    offset = HEADER.size
+    algorithm = data[offset:offset + nameLength].decode()
+    offset += nameLength
+    cells = array("i")
+    cells.frombytes(data[offset:offset + 4 * count])
+    if sys.byteorder == "big": cells.byteswap()
+    states = bytearray(data[offset + 4 * count:offset + 5 * count])
+    return EventLog(cells, states, width, height, start, end, algorithm)
@@ -0,0 +1,108 @@
+"""Compact, pygame-free grid layout shared by the solvers.
+
+Cells are stored row-major in a flat byte buffer, so a cell is addressed by its
+index ``row * width + col``. Only ``EMPTY`` and ``BARRIER`` are meaningful to the
+solvers; the remaining codes describe search progress for whoever is displaying it.
+
+Terrain is optional: ``weights`` holds the cost of stepping onto each cell, 1 (plain
+floor) to 255. Without it every step costs 1. Costs never drop below 1, so Manhattan
+distance stays an admissible and consistent heuristic on weighted grids too.
+
+Edits made through ``setBarrier`` / ``setWeight`` bump ``version``; once something
+calls ``watch``, the edited indices are also journaled in ``edits`` so incremental
+planners can repair just those cells. Writing ``cells`` or ``weights`` directly
+bypasses both, and for ``weights`` also the count of costly cells behind ``isUniform``.
+"""
+
+EMPTY, BARRIER, START, END, OPEN, CLOSED, PATH, JUMP = range(8)
+OPEN_BACK, CLOSED_BACK = 8, 9  # frontier of the backward half of a bidirectional search
+
+
+def heavyCells(weights):
+    data = bytes(weights) if isinstance(weights, memoryview) else weights
+    return len(data) - data.count(0) - data.count(1)
+
+
+class Grid:
+    def __init__(self, width, height, cells=None, weights=None):
+        self.width = width
+        self.height = height
+        if cells is None:
+            cells = bytearray(width * height)
+        elif not isinstance(cells, (bytes, bytearray)):
+            cells = memoryview(cells).cast("B")  # NumPy arrays and other buffers, without copying
+        if len(cells) != width * height:
+            raise ValueError(f"expected {width * height} cells, got {len(cells)}")
+        self.cells = cells
+        if weights is not None:
+            if not isinstance(weights, (bytes, bytearray)):
+                weights = memoryview(weights).cast("B")
+            if len(weights) != width * height:
+                raise ValueError(f"expected {width * height} weights, got {len(weights)}")
+        self.weights = weights  # None while every cell costs 1
+        self.costly = heavyCells(weights) if weights is not None else 0  # cells costing more than 1
+        self.version = 0
+        self.edits = None  # indices of edited cells, in order, once watch() has been called
+        self.scratch = {}  # per-grid state the searches keep between runs (buffers, caches)
+
+    def __getstate__(self):
+        # ship only the layout to other processes; scratch is rebuilt on demand and memoryviews don't pickle
+        weights = bytes(self.weights) if self.weights is not None else None
+        return {"width": self.width, "height": self.height, "cells": bytes(self.cells), "weights": weights}
+
+    def __setstate__(self, state):
+        weights = state.get("weights")
+        self.__init__(state["width"], state["height"], bytearray(state["cells"]),
+                      bytearray(weights) if weights is not None else None)
+
+    @classmethod
+    def fromRows(cls, rows, barrier="#"):
+        """Build a grid from equal-length strings, e.g. ``["..#", "..."]``."""
+        height, width = len(rows), len(rows[0]) if rows else 0
+        cells = bytearray(BARRIER if ch == barrier else EMPTY for line in rows for ch in line)
+        return cls(width, height, cells)
+
+    def index(self, row, col): return row * self.width + col
+    def pos(self, idx): return divmod(idx, self.width)
+    def isBarrier(self, idx): return self.cells[idx] == BARRIER
+    def weight(self, idx): return self.weights[idx] if self.weights is not None else 1
+    def isUniform(self): return self.costly == 0
+
+    def watch(self):
+        """Start journaling edits if nobody has yet; returns the journal position to read from."""
+        if self.edits is None: self.edits = []
+        return len(self.edits)
+
+    def edited(self, idx):
+        self.version += 1
+        if self.edits is not None: self.edits.append(idx)
+
+    def setBarrier(self, row, col, blocked=True):
+        idx = row * self.width + col
+        self.cells[idx] = BARRIER if blocked else EMPTY
+        self.edited(idx)
+
+    def setWeight(self, row, col, cost):
+        """Cost of stepping onto the cell at (row, col), 1 to 255."""
+        if not 1 <= cost <= 255:
+            raise ValueError(f"cell cost must be between 1 and 255, got {cost}")
+        idx = row * self.width + col
+        if self.weights is None:
+            if cost == 1: return
+            self.weights = bytearray([1]) * (self.width * self.height)
+        old = self.weights[idx]
+        if old == cost: return
+        self.costly += (cost > 1) - (old > 1)
+        self.weights[idx] = cost
+        self.edited(idx)
+
+    def neighbors(self, idx):
+        """Free 4-connected neighbours of ``idx`` (down, up, right, left)."""
+        width, cells = self.width, self.cells
+        row, col = divmod(idx, width)
+        result = []
+        if row < self.height - 1 and cells[idx + width] != BARRIER: result.append(idx + width)
+        if row > 0 and cells[idx - width] != BARRIER: result.append(idx - width)
+        if col < width - 1 and cells[idx + 1] != BARRIER: result.append(idx + 1)
+        if col > 0 and cells[idx - 1] != BARRIER: result.append(idx - 1)
+        return result
@@ -0,0 +1,109 @@
+"""Saving and loading grids: a compact binary format, plus MovingAI benchmark files.
+
+Binary layout (little-endian), after a 16-byte header ``MAGIC, version, flags, width, height``:
+
+* the cells, one byte each (``EMPTY`` / ``BARRIER``), or one bit each with ``PACKED``;
+* with ``WEIGHTED``, one step-cost byte per cell.
+
+Unpacked files are opened with ``mmap`` in copy-on-write mode: the grid's buffers
+are views straight into the mapping, so even huge maps open at once and pages are
+read only when something touches them. Edits stay in memory and never reach the file.
+
+MovingAI ``.map`` files (https://movingai.com/benchmarks/) import as grids and
+``.scen`` files as query lists. Their maps are 8-connected, so the optimal lengths
+recorded in a scenario are octile distances, not 4-connected ones.
+"""
+
+import mmap
+import os
+import struct
+
+from grid import Grid, EMPTY, BARRIER
+
+MAGIC = b"PFGRID"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<6sBBII")
+PACKED, WEIGHTED = 1, 2  # header flags
+
+# MovingAI terrain: passable ground, swamp and water (as costly ground); everything else blocks
+MOVINGAI_COSTS = {b".": 1, b"G": 1, b"S": 5, b"W": 20}
+MOVINGAI_CELLS = bytes(EMPTY if bytes([ch]) in MOVINGAI_COSTS else BARRIER for ch in range(256))
+MOVINGAI_WEIGHTS = bytes(MOVINGAI_COSTS.get(bytes([ch]), 1) for ch in range(256))
+TO_BITS = bytes.maketrans(bytes([EMPTY, BARRIER]), b"01")
+FROM_BITS = bytes.maketrans(b"01", bytes([EMPTY, BARRIER]))
+
+
+def save(grid, path, packed=False):
+    """Write ``grid`` (cells and weights, if any) to ``path``; ``packed`` stores one bit per cell."""
+    flags = (PACKED if packed else 0) | (WEIGHTED if grid.weights is not None else 0)
+    # write beside it and rename over: a grid mapped from ``path`` keeps reading the old file
+    partial = path + ".partial"
+    with open(partial, "wb") as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, flags, grid.width, grid.height))
+        if packed:
+            size = grid.width * grid.height
+            bits = bytes(grid.cells).translate(TO_BITS) + b"0" * (-size % 8)  # pad the last byte at its end
+            f.write(int(bits or b"0", 2).to_bytes((size + 7) // 8, "big"))
+        else:
+            f.write(grid.cells)
+        if grid.weights is not None:
+            f.write(grid.weights)
+    os.replace(partial, path)
+
+
+def load(path):
+    """Open a grid saved by ``save``. Unpacked cells and weights are memory-mapped, not read."""
+    with open(path, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+    magic, version, flags, width, height = HEADER.unpack_from(mapped)
+    if magic != MAGIC or version != FORMAT_VERSION:
+        raise ValueError(f"{path} is not a grid file (or a newer version)")
+    size, offset = width * height, HEADER.size
+    view = memoryview(mapped)
+    if flags & PACKED:
+        length = (size + 7) // 8
+        bits = bin(int.from_bytes(view[offset:offset + length], "big"))[2:].zfill(length * 8)
+        cells = bytearray(bits[:size].encode().translate(FROM_BITS))
+        offset += length
+    else:
+        cells = view[offset:offset + size]
+        offset += size
+    weights = view[offset:offset + size] if flags & WEIGHTED else None
+    return Grid(width, height, cells, weights)
+
+
+def loadMovingAI(path):
+    """Import a MovingAI ``.map`` file; swamp and water become costlier ground."""
+    with open(path, "rb") as f:
+        header = {}
+        for line in f:
+            if line.strip() == b"map": break
+            key, _, value = line.partition(b" ")
+            header[key] = value.strip()
+        width, height = int(header[b"width"]), int(header[b"height"])
+        text = b"".join(line.rstrip(b"\r\n")[:width] for line in f)
+    if len(text) != width * height:
+        raise ValueError(f"{path}: expected {height} rows of {width} cells")
+    cells = text.translate(MOVINGAI_CELLS)
+    weights = bytearray(text.translate(MOVINGAI_WEIGHTS)) if any(ch in text for ch in b"SW") else None
+    return Grid(width, height, bytearray(cells), weights)
+
+
+def loadScenario(path):
+    """Queries from a MovingAI ``.scen`` file: ``(mapName, start, end, optimalLength)``, with (row, col) ends."""
+    queries = []
+    with open(path) as f:
+        for line in f:
+            fields = line.split("\t")
+            if len(fields) < 9: continue  # the "version" line
+            mapName = fields[1]
+            startCol, startRow, endCol, endRow = map(int, fields[4:8])
+            queries.append((mapName, (startRow, startCol), (endRow, endCol), float(fields[8])))
+    return queries
+
+
+def openGrid(path):
+    """Load ``path`` by extension: ``.map`` is MovingAI, anything else the binary format."""
+    if os.path.splitext(path)[1].lower() == ".map":
+        return loadMovingAI(path)
+    return load(path)
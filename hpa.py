@@ -0,0 +1,264 @@
+"""Hierarchical pathfinding (HPA*) over a cached abstract graph.
+
+The grid is cut into square clusters. Wherever two neighbouring clusters share a
+run of free cells along their border, the run becomes one entrance (two for runs of
+``WIDE_ENTRANCE`` cells or more): a pair of facing cells, one on each side, linked
+by a single step. Entrance cells are the abstract graph's nodes; inside a cluster
+they are joined by edges weighted with their in-cluster distances, which are
+computed lazily the first time a query reaches the cluster.
+
+A query links ``start`` and ``end`` to the entrances of their clusters, runs A* on
+the abstract graph and refines each abstract edge back into cells with a search
+confined to one cluster. Paths are near-optimal: routes are forced through the
+chosen entrance cells.
+
+The graph lives in ``grid.scratch`` and follows ``Grid.edits``: an edit rebuilds
+the borders of its own cluster and drops the cached distances of that cluster and
+of any neighbour whose entrances changed. Everything else is kept. Headless callers
+can warm it up front with ``abstractGraph(grid).precompute()``.
+"""
+
+from collections import deque
+
+from grid import OPEN, CLOSED, PATH
+from openset import OpenSet
+from search import SearchResult
+
+CLUSTER_SIZE = 16
+WIDE_ENTRANCE = 6
+START, END = -1, -2  # virtual abstract nodes for the query's own cells
+
+
+class AbstractGraph:
+    def __init__(self, grid, size=CLUSTER_SIZE):
+        self.grid, self.size = grid, size
+        self.rows = -(-grid.height // size)
+        self.cols = -(-grid.width // size)
+        self.seen = grid.watch()
+        self.borders = {}  # ("h" | "v", clusterRow, clusterCol) -> [(cell, facing cell)]
+        self.links = {}  # entrance cell -> facing cells across borders
+        self.edges = {}  # cluster -> {entrance: [(entrance, cost)]}, filled on demand
+        self.expanded = 0  # cells settled by local searches, for stats
+        for cr in range(self.rows):
+            for cc in range(self.cols):
+                if cr + 1 < self.rows: self.buildBorder(("h", cr, cc))
+                if cc + 1 < self.cols: self.buildBorder(("v", cr, cc))
+
+    def cluster(self, idx):
+        row, col = divmod(idx, self.grid.width)
+        return row // self.size * self.cols + col // self.size
+
+    def bounds(self, cluster):
+        cr, cc = divmod(cluster, self.cols)
+        size, grid = self.size, self.grid
+        return cr * size, min(cr * size + size, grid.height), cc * size, min(cc * size + size, grid.width)
+
+    def bordersOf(self, cluster):
+        cr, cc = divmod(cluster, self.cols)
+        if cr > 0: yield ("h", cr - 1, cc)
+        if cr + 1 < self.rows: yield ("h", cr, cc)
+        if cc > 0: yield ("v", cr, cc - 1)
+        if cc + 1 < self.cols: yield ("v", cr, cc)
+
+    def buildBorder(self, key):
+        """(Re)compute one border's entrances; returns True if they changed."""
+        kind, cr, cc = key
+        grid, size, width = self.grid, self.size, self.grid.width
+        if kind == "h":  # below cluster (cr, cc): step +width
+            row = cr * size + size - 1
+            cells = [row * width + col for col in range(cc * size, min(cc * size + size, width))]
+            step = width
+        else:  # right of cluster (cr, cc): step +1
+            col = cc * size + size - 1
+            cells = [row * width + col for row in range(cr * size, min(cr * size + size, grid.height))]
+            step = 1
+        pairs, run = [], []
+        for idx in cells + [None]:
+            if idx is not None and not grid.isBarrier(idx) and not grid.isBarrier(idx + step):
+                run.append(idx)
+                continue
+            if run:
+                picks = (run[0], run[-1]) if len(run) >= WIDE_ENTRANCE else (run[len(run) // 2],)
+                pairs += [(cell, cell + step) for cell in picks]
+                run = []
+
+        old = self.borders.get(key, [])
+        self.borders[key] = pairs
+        if pairs == old: return False
+        for a, b in old:
+            for x, y in ((a, b), (b, a)):
+                self.links[x].remove(y)
+                if not self.links[x]: del self.links[x]
+        for a, b in pairs:
+            self.links.setdefault(a, []).append(b)
+            self.links.setdefault(b, []).append(a)
+        return True
+
+    def entrances(self, cluster):
+        found = []
+        for key in self.bordersOf(cluster):
+            for pair in self.borders[key]:
+                found += [idx for idx in pair if self.cluster(idx) == cluster and idx not in found]
+        return found
+
+    def clusterEdges(self, cluster):
+        edges = self.edges.get(cluster)
+        if edges is None:
+            nodes = self.entrances(cluster)
+            edges = self.edges[cluster] = {}
+            for node in nodes:
+                dist, _ = self.local(node, cluster)
+                edges[node] = [(other, dist[other]) for other in nodes if other != node and other in dist]
+        return edges
+
+    def precompute(self):
+        """Fill the distance cache of every cluster now instead of query by query."""
+        for cluster in range(self.rows * self.cols):
+            self.clusterEdges(cluster)
+        return self
+
+    def update(self):
+        """Catch up with the grid's edit journal."""
+        edits = self.grid.edits
+        touched = {self.cluster(idx) for idx in edits[self.seen:]}
+        self.seen = len(edits)
+        for cluster in touched:
+            self.edges.pop(cluster, None)
+            for key in self.bordersOf(cluster):
+                if self.buildBorder(key):
+                    _, cr, cc = key
+                    self.edges.pop(cr * self.cols + cc, None)  # the cluster above / left of the border
+                    self.edges.pop((cr + 1) * self.cols + cc if key[0] == "h" else cr * self.cols + cc + 1, None)
+
+    def local(self, origin, cluster, target=-1, backward=False):
+        """Dijkstra from ``origin`` confined to ``cluster``; returns (dist, parent) dicts.
+
+        Backward searches measure the cost of reaching ``origin`` instead, so a parent
+        chain leads towards it. With a ``target`` it is an A* that stops there.
+        """
+        grid, weights = self.grid, self.grid.weights
+        top, bottom, left, right = self.bounds(cluster)
+        width = grid.width
+        if weights is None and target < 0:
+            return self.flood(origin, top, bottom, left, right)
+        targetRow, targetCol = divmod(target, width)
+        dist, parent, openSet = {origin: 0}, {origin: -1}, OpenSet()
+        openSet.push(origin, 0)
+        while openSet:
+            current = openSet.pop()
+            self.expanded += 1
+            if current == target: break
+            step = (weights[current] if weights is not None else 1) if backward else None
+            for neighbor in grid.neighbors(current):
+                row, col = divmod(neighbor, width)
+                if not (top <= row < bottom and left <= col < right): continue
+                cost = step if backward else (weights[neighbor] if weights is not None else 1)
+                tempG = dist[current] + cost
+                if tempG < dist.get(neighbor, tempG + 1):
+                    dist[neighbor], parent[neighbor] = tempG, current
+                    openSet.push(neighbor, tempG + abs(row - targetRow) + abs(col - targetCol) if target >= 0 else tempG)
+        return dist, parent
+
+    def flood(self, origin, top, bottom, left, right):
+        # unit costs: breadth-first order is distance order, no heap needed
+        grid, width = self.grid, self.grid.width
+        dist, parent = {origin: 0}, {origin: -1}
+        queue = deque([origin])
+        while queue:
+            current = queue.popleft()
+            self.expanded += 1
+            d = dist[current] + 1
+            for neighbor in grid.neighbors(current):
+                if neighbor in dist: continue
+                row, col = divmod(neighbor, width)
+                if top <= row < bottom and left <= col < right:
+                    dist[neighbor], parent[neighbor] = d, current
+                    queue.append(neighbor)
+        return dist, parent
+
+
+def abstractGraph(grid, size=CLUSTER_SIZE):
+    graph = grid.scratch.get("hpa")
+    if graph is None or graph.size != size:
+        graph = grid.scratch["hpa"] = AbstractGraph(grid, size)
+    graph.update()
+    return graph
+
+
+def chain(parent, idx):
+    cells = []
+    while idx >= 0:
+        cells.append(idx)
+        idx = parent[idx]
+    return cells
+
+
+def hpaStar(grid, start, end, trace=False):
+    graph = abstractGraph(grid)
+    graph.expanded = 0
+    width, weights = grid.width, grid.weights
+    endRow, endCol = divmod(end, width)
+    startCluster, endCluster = graph.cluster(start), graph.cluster(end)
+    fromStart, startParent = graph.local(start, startCluster)
+    toEnd, endParent = graph.local(end, endCluster, backward=True)
+
+    def h(idx):
+        row, col = divmod(idx, width)
+        return abs(row - endRow) + abs(col - endCol)
+
+    g, parent, openSet = {START: 0}, {START: None}, OpenSet()
+
+    def relax(node, via, cost):
+        if cost < g.get(node, cost + 1):
+            g[node], parent[node] = cost, via
+            openSet.push(node, (cost + (h(node) if node != END else 0), h(node) if node != END else 0))
+            return True
+        return False
+
+    if end in fromStart:  # same cluster: the direct route competes with detours through entrances
+        relax(END, START, fromStart[end])
+    for node in graph.entrances(startCluster):
+        if node in fromStart and relax(node, START, fromStart[node]) and trace:
+            yield node, OPEN
+
+    expanded = 0
+    while openSet:
+        node = openSet.pop()
+        if node == END: break
+        expanded += 1
+        cluster = graph.cluster(node)
+        neighbors = list(graph.clusterEdges(cluster).get(node, ()))
+        neighbors += [(other, weights[other] if weights is not None else 1) for other in graph.links.get(node, ())]
+        if cluster == endCluster and node in toEnd:
+            neighbors.append((END, toEnd[node]))
+        for other, cost in neighbors:
+            if relax(other, node, g[node] + cost) and trace and other != END:
+                yield other, OPEN
+        if trace:
+            yield node, CLOSED
+
+    stats = {"expanded": expanded, "abstractNodes": len(graph.links), "cachedClusters": len(graph.edges)}
+    if END not in g:
+        stats["refined"] = graph.expanded
+        return SearchResult([], stats)
+
+    nodes = [END]
+    while parent[nodes[-1]] != START: nodes.append(parent[nodes[-1]])
+    nodes.reverse()  # entrance cells from the first to the last, then END
+    if nodes[0] == END:
+        path = chain(startParent, end)[::-1]
+    else:
+        path = chain(startParent, nodes[0])[::-1]
+        for a, b in zip(nodes, nodes[1:]):
+            if b == END:
+                path += chain(endParent, a)[1:]
+            elif b in graph.links.get(a, ()):
+                path.append(b)
+            else:
+                _, local = graph.local(a, graph.cluster(a), target=b)
+                path += chain(local, b)[::-1][1:]
+    stats["refined"] = graph.expanded
+    if trace:
+        for idx in reversed(path[1:-1]):
+            yield idx, PATH
+    return SearchResult(path, stats)
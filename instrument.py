@@ -0,0 +1,67 @@
+"""Measurements of one visualized search: where the time went and what the search did.
+
+Times are ``perf_counter_ns`` sums per phase: ``search`` inside the search generator,
+``render`` applying its events to the board and drawing frames, ``events`` pumping
+the pygame event queue. ``wall`` is the whole run, frame-rate waits included.
+Counters are copied from ``SearchResult.stats``; a search that does not track one
+(the wavefront has no heap, say) simply leaves it out.
+"""
+
+import json
+import time
+from collections import deque
+
+PHASES = ("search", "render", "events")
+COUNTERS = ("expanded", "relaxations", "pushes", "pops", "stalePops", "peakOpen")
+FRAME_HISTORY = 160  # frames kept for the header graph
+SHORT_NAMES = {"expanded": "exp", "relaxations": "relax", "pushes": "push", "pops": "pop",
+               "stalePops": "stale", "peakOpen": "peak"}
+
+
+class RunMetrics:
+    def __init__(self, algorithm):
+        self.algorithm = algorithm
+        self.ns = dict.fromkeys(PHASES, 0)
+        self.wallNs = 0
+        self.counters = {}
+        self.pathLength = None
+        self.cached = False
+
+    def add(self, phase, since):
+        """Charge the time since ``since`` (a ``perf_counter_ns`` reading) to ``phase``; returns now."""
+        now = time.perf_counter_ns()
+        self.ns[phase] += now - since
+        return now
+
+    def finish(self, result):
+        self.counters = {key: result.stats[key] for key in COUNTERS if key in result.stats}
+        self.pathLength = result.length
+        return self
+
+    def record(self):
+        """One JSON-ready dict per run, as ``appendJsonl`` writes it."""
+        return {"algorithm": self.algorithm, "timestamp": time.time(), "cached": self.cached,
+                **{f"{phase}Ns": ns for phase, ns in self.ns.items()}, "wallNs": self.wallNs,
+                **self.counters, "pathLength": self.pathLength}
+
+    def summary(self):
+        times = " ".join(f"{phase} {ns / 1e6:.1f}ms" for phase, ns in self.ns.items())
+        counts = " ".join(f"{SHORT_NAMES[key]} {value}" for key, value in self.counters.items())
+        return f"{self.algorithm}: {times} | {counts} len {self.pathLength if self.pathLength is not None else '-'}"
+
+
+class FrameTimes:
+    """Per-phase ns of the last ``FRAME_HISTORY`` frames, oldest first."""
+
+    def __init__(self):
+        self.frames = deque(maxlen=FRAME_HISTORY)
+        self.count = 0  # frames ever pushed, so a renderer can tell when the history moved
+
+    def push(self, search, render, events):
+        self.frames.append((search, render, events))
+        self.count += 1
+
+
+def appendJsonl(path, record):
+    with open(path, "a") as f:
+        f.write(json.dumps(record) + "\n")
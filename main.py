@@ -1,231 +1,843 @@
 import pygame
+import re
 import time
-from queue import PriorityQueue
+import queue
+import argparse
+import multiprocessing
+from array import array
+from concurrent.futures import ProcessPoolExecutor, wait
+
+import solver
+import gridfile
+from grid import Grid, EMPTY, BARRIER, START, END, CLOSED, PATH, CLOSED_BACK
+from search import Trace
+from components import connected
+from querycache import queryCache
+from instrument import RunMetrics, FrameTimes, appendJsonl, FRAME_HISTORY
+from profiling import profiled
+import eventlog
+from eventlog import EventLog, BARE
+from stream import SearchStream
 
 # === CONFIG ===
-pygame.init()
-WINDOW_WIDTH, GRID_HEIGHT, HEADER_HEIGHT = 800, 780, 70
+# pygame is initialised in main(): compare workers import this module too and must stay off the display
+WINDOW_WIDTH, GRID_HEIGHT, HEADER_HEIGHT = 800, 760, 164
 WINDOW_HEIGHT = GRID_HEIGHT + HEADER_HEIGHT
-ROWS = 50
-FONT = pygame.font.SysFont("consolas", 18)
+ROWS = 50  # default grid size; see --rows / --cols
+FONT = ("consolas", 18)  # SysFont name and size
 
 # === COLORS ===
 RED, GREEN, YELLOW = (255, 0, 0), (0, 255, 0), (255, 255, 0)
 WHITE, BLACK = (255, 255, 255), (0, 0, 0)
 PURPLE, GREY, TURQUOISE = (128, 0, 128), (128, 128, 128), (64, 224, 208)
-CYAN = (0, 255, 255)
+CYAN, ORANGE = (0, 255, 255), (255, 165, 0)
+SKY, BLUE = (135, 206, 250), (30, 80, 220)  # backward frontier: open / closed
+BROWN, TEAL = (139, 90, 43), (0, 128, 128)
 
-win = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
-pygame.display.set_caption("Pathfinding Visualizer")
+# === TERRAIN ===
+BRUSHES = {pygame.K_b: ("Wall", None), pygame.K_m: ("Mud", 5), pygame.K_w: ("Water", 20)}  # name, step cost
+
+# === CAMERA ===
+ZOOM_STEP = 1.25  # per mouse-wheel notch
+MAX_ZOOM = 64  # pixels per cell
+GRID_LINES_ZOOM = 6  # draw cell borders from this many pixels per cell
+DIRTY_LIMIT = 4096  # changed cells a frame repaints one by one; past this it redraws the whole grid area
+PAN_KEYS = {pygame.K_LEFT: (200, 0), pygame.K_RIGHT: (-200, 0), pygame.K_UP: (0, 200), pygame.K_DOWN: (0, -200)}
+
+# === FRAME GRAPH ===
+GRAPH = pygame.Rect(WINDOW_WIDTH - FRAME_HISTORY - 12, HEADER_HEIGHT - 64, FRAME_HISTORY, 56)  # bottom-right of the header
+GRAPH_COLORS = (GREEN, ORANGE, SKY)  # search, render, event pump
+
+# === SPEED ===
+FPS = 60
+FRAME_BUDGET_NS = int(0.8e9 / FPS)  # search time per frame in instant mode
+SPEEDS = {pygame.K_F1: 1, pygame.K_F2: 10, pygame.K_F3: 100, pygame.K_F4: None}  # expansions per frame, None = instant
+
+# === PLAYBACK ===
+RUN_KEYS = {pygame.K_SPACE, pygame.K_ESCAPE}  # pause / cancel a search in progress
+PLAYBACK_KEYS = {pygame.K_SPACE, pygame.K_r, pygame.K_COMMA, pygame.K_PERIOD, pygame.K_PAGEUP, pygame.K_PAGEDOWN, pygame.K_l}
 
 # === ALGORITHMS ===
-ALGORITHMS = {
-    "Dijkstra": {"key": pygame.K_1, "h": False},
-    "A*": {"key": pygame.K_2, "h": True}
-}
-
-class Spot:
-    def __init__(self, row, col, cellSize, totalRows):
-        self.row = row
-        self.col = col
-        self.x = col * cellSize
-        self.y = row * cellSize + HEADER_HEIGHT
-        self.color = WHITE
-        self.neighbors = []
-        self.cellSize = cellSize
-        self.totalRows = totalRows
-
-    def getPos(self): return self.row, self.col
-    def isClosed(self): return self.color == RED
-    def isOpen(self): return self.color == GREEN
-    def isBarrier(self): return self.color == BLACK
-    def isStart(self): return self.color == PURPLE
-    def isEnd(self): return self.color == TURQUOISE
-    def reset(self): self.color = WHITE
-    def makeClosed(self): self.color = RED
-    def makeOpen(self): self.color = GREEN
-    def makeBarrier(self): self.color = BLACK
-    def makeStart(self): self.color = PURPLE
-    def makeEnd(self): self.color = TURQUOISE
-    def makePath(self): self.color = YELLOW
-
-    def draw(self, win):
-        pygame.draw.rect(win, self.color, (self.x, self.y, self.cellSize, self.cellSize))
-
-    def updateNeighbors(self, grid):
-        self.neighbors = []
-        if self.row < self.totalRows - 1 and not grid[self.row+1][self.col].isBarrier(): self.neighbors.append(grid[self.row+1][self.col])
-        if self.row > 0 and not grid[self.row-1][self.col].isBarrier(): self.neighbors.append(grid[self.row-1][self.col])
-        if self.col < self.totalRows - 1 and not grid[self.row][self.col+1].isBarrier(): self.neighbors.append(grid[self.row][self.col+1])
-        if self.col > 0 and not grid[self.row][self.col-1].isBarrier(): self.neighbors.append(grid[self.row][self.col-1])
-
-    def __lt__(self): return False
-
-def h(p1, p2): return abs(p1[0] - p2[0]) + abs(p1[1] - p2[1])
-
-def reconstructPath(cameFrom, current, draw):
-    while current in cameFrom:
-        current = cameFrom[current]
-        if current.isStart(): continue
-        current.makePath()
-        draw()
-
-def runAlgorithm(draw, grid, start, end, useh):
-    count, openSet = 0, PriorityQueue()
-    openSet.put((0, count, start))
-    cameFrom = {}
-    gScore = {spot: float("inf") for row in grid for spot in row}
-    fScore = {spot: float("inf") for row in grid for spot in row}
-    gScore[start] = 0
-    fScore[start] = h(start.getPos(), end.getPos()) if useh else 0
-    openSetHash = {start}
-
-    while not openSet.empty():
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                quit()
-        current = openSet.get()[2]
-        openSetHash.remove(current)
-
-        if current == end:
-            reconstructPath(cameFrom, end, draw)
-            end.makeEnd()
-            return True
-
-        for neighbor in current.neighbors:
-            tempG = gScore[current] + 1
-            if tempG < gScore[neighbor]:
-                cameFrom[neighbor] = current
-                gScore[neighbor] = tempG
-                fScore[neighbor] = tempG + (h(neighbor.getPos(), end.getPos()) if useh else 0)
-                if neighbor not in openSetHash:
-                    count += 1
-                    openSet.put((fScore[neighbor], count, neighbor))
-                    openSetHash.add(neighbor)
-                    neighbor.makeOpen()
-        draw()
-        if current != start:
-            current.makeClosed()
-    return False
-
-def makeGrid(rows, width):
-    size = width // rows
-    return [[Spot(i, j, size, rows) for j in range(rows)] for i in range(rows)]
-
-def drawGrid(win, rows, width):
-    size = width // rows
-    for i in range(rows):
-        pygame.draw.line(win, GREY, (0, i * size + HEADER_HEIGHT), (width, i * size + HEADER_HEIGHT))
-        for j in range(rows):
-            pygame.draw.line(win, GREY, (j * size, HEADER_HEIGHT), (j * size, width + HEADER_HEIGHT))
-
-def drawHeader(win, selection, times):
+KEYS = {"Dijkstra": pygame.K_1, "A*": pygame.K_2, "JPS": pygame.K_3, "Bi-Dijkstra": pygame.K_4, "Bi-A*": pygame.K_5,
+        "Dial": pygame.K_6, "Wavefront": pygame.K_7, "D* Lite": pygame.K_8, "HPA*": pygame.K_9}
+# every search registered in solver.ALGORITHMS; one without a key still runs in Compare
+ALGORITHMS = {name: {"key": KEYS.get(name), "search": search} for name, search in solver.ALGORITHMS.items()}
+
+# === CELL STATES ===
+MUD, WATER = 10, 11  # display-only: bare terrain, after the solver's state codes
+PALETTE = [WHITE, BLACK, PURPLE, TURQUOISE, GREEN, RED, YELLOW, ORANGE, SKY, BLUE, BROWN, TEAL]  # indexed by state
+STEP_STATES = {CLOSED, CLOSED_BACK, PATH}  # the events the speed setting counts
+
+def terrainState(weight):
+    return EMPTY if weight == 1 else MUD if weight < BRUSHES[pygame.K_w][1] else WATER
+
+TERRAIN_STATES = bytes(terrainState(max(weight, 1)) for weight in range(256))  # step cost -> state
+BARRIER_RUN = re.compile(re.escape(bytes([BARRIER])) + b"+")
+
+def terrainStates(layout):
+    # EMPTY and BARRIER are palette indices already; weighted cells get their terrain state, then walls go back on top
+    if layout.weights is None: return bytearray(layout.cells)
+    states = bytearray(bytes(layout.weights).translate(TERRAIN_STATES))
+    for run in BARRIER_RUN.finditer(layout.cells):
+        start, end = run.span()
+        states[start:end] = layout.cells[start:end]
+    return states
+
+class Board:
+    """What the grid area shows: one palette index per cell, kept in step with the solver's ``layout``.
+
+    Cells are flat indices, as in ``grid.Grid``; there is no per-cell object, so the
+    board scales to maps far larger than the window.
+    """
+
+    def __init__(self, rows, cols, layout=None, states=None):
+        self.rows, self.cols = rows, cols
+        self.layout = layout if layout is not None else Grid(cols, rows)
+        self.states = states if states is not None else terrainStates(self.layout)
+        self.touched = array("i")  # cells painted by searches since the last clear
+        self.changed = array("i")  # cells repainted since the renderer last took them, up to DIRTY_LIMIT + 1
+
+    def paint(self, idx, state):
+        old = self.states[idx]
+        if old == state: return
+        if BARRIER in (old, state):
+            self.layout.setBarrier(*self.layout.pos(idx), state == BARRIER)
+        self.states[idx] = state
+        if len(self.changed) <= DIRTY_LIMIT: self.changed.append(idx)
+
+    def reset(self, idx): self.paint(idx, terrainState(self.layout.weight(idx)))  # back to bare terrain
+    def erase(self, idx): self.setTerrain(idx, 1)
+
+    def setTerrain(self, idx, weight):
+        self.layout.setWeight(*self.layout.pos(idx), weight)
+        self.reset(idx)
+
+    def mark(self, idx, state):
+        # search progress: remembered so clearSearch only visits what a search touched
+        self.touched.append(idx)
+        self.paint(idx, state)
+
+    def takeChanged(self):
+        changed, self.changed = self.changed, array("i")
+        return changed
+
+    def clearSearch(self):
+        states = self.states
+        for idx in self.touched:
+            if states[idx] not in (BARRIER, START, END):
+                self.reset(idx)
+        self.touched = array("i")
+
+class Scheduler:
+    """Advances a search in per-frame batches and renders once per frame, capped at FPS."""
+
+    def __init__(self, frameTimes):
+        self.clock = pygame.time.Clock()
+        self.stepsPerFrame = SPEEDS[pygame.K_F2]
+        self.frameTimes = frameTimes
+
+    def label(self): return f"{self.stepsPerFrame}x" if self.stepsPerFrame else "instant"
+
+    def setSpeed(self, key):
+        if key not in SPEEDS: return False
+        self.stepsPerFrame = SPEEDS[key]
+        return True
+
+    def run(self, events, apply, draw, metrics):
+        # expanded nodes and path cells are steps; other events ride along with their expansion
+        steps, clock, ns = iter(events), time.perf_counter_ns, metrics.ns
+        while True:
+            before = tuple(ns.values())
+            t = clock()
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    pygame.quit()
+                    quit()
+                if event.type == pygame.KEYDOWN:
+                    self.setSpeed(event.key)
+            t = frameStart = metrics.add("events", t)
+
+            count, done = 0, False
+            while True:
+                try:
+                    idx, state = next(steps)
+                except StopIteration:
+                    done = True
+                    break
+                t1 = clock()
+                ns["search"] += t1 - t
+                apply(idx, state)
+                t = clock()
+                ns["render"] += t - t1
+                if state not in STEP_STATES: continue
+                count += 1
+                if self.stepsPerFrame is None:
+                    if t - frameStart >= FRAME_BUDGET_NS: break
+                elif count >= self.stepsPerFrame: break
+
+            draw()
+            metrics.add("render", t)
+            self.frameTimes.push(*(now - then for now, then in zip(ns.values(), before)))
+            if done: return
+            self.clock.tick(FPS)
+
+class Player:
+    """Plays an ``EventLog`` onto the board without searching again.
+
+    ``position`` counts the events applied. Playback runs forward at the scheduler's
+    speed; stepping and scrubbing move by step events (``STEP_STATES``) either way,
+    restoring each cell's earlier state on the way back.
+    """
+
+    SCRUB = 20  # PageUp / PageDown move a twentieth of the log
+
+    def __init__(self, board, log, position=0):
+        self.board, self.log = board, log
+        self.position = self.reached = position  # reached: events already marked once, so undo-redo won't re-mark
+        self.playing = False
+        self.steps = sum(log.states.count(state) for state in STEP_STATES)
+
+    def atEnd(self): return self.position == len(self.log)
+
+    def forward(self, steps):
+        log, board = self.log, self.board
+        cells, states, count = log.cells, log.states, 0
+        while self.position < len(cells) and count < steps:
+            idx, state = cells[self.position], states[self.position]
+            if idx != log.start and idx != log.end:
+                if self.position < self.reached: board.paint(idx, state)
+                else: board.mark(idx, state)
+            self.position += 1
+            if state in STEP_STATES: count += 1
+        self.reached = max(self.reached, self.position)
+
+    def backward(self, steps):
+        log, board = self.log, self.board
+        cells, states, before, count = log.cells, log.states, log.before, 0
+        while self.position > 0 and count < steps:
+            self.position -= 1
+            idx, state = cells[self.position], before[self.position]
+            if idx != log.start and idx != log.end:
+                if state == BARE: board.reset(idx)
+                else: board.paint(idx, state)
+            if states[self.position] in STEP_STATES: count += 1
+
+    def rewind(self):
+        # every event counts at most one step, so this undoes back to position 0, non-step tail included
+        self.backward(len(self.log))
+
+    def scrub(self, direction):
+        self.playing = False
+        steps = max(1, self.steps // self.SCRUB)
+        if direction > 0: self.forward(steps)
+        else: self.backward(steps)
+
+    def tick(self, stepsPerFrame):
+        """Advance one frame's worth of playback."""
+        if stepsPerFrame is not None:
+            self.forward(stepsPerFrame)
+        else:
+            frameStart = time.perf_counter_ns()
+            while not self.atEnd() and time.perf_counter_ns() - frameStart < FRAME_BUDGET_NS:
+                self.forward(1000)
+        if self.atEnd(): self.playing = False
+
+    def label(self):
+        status = "playing" if self.playing else "paused"
+        return f"Log: {self.log.algorithm} {self.position}/{len(self.log)} events ({status})"
+
+class LiveRun:
+    """A search on a worker thread (``stream.SearchStream``), shown a frame's worth at a time.
+
+    The main loop keeps drawing and handling input at FPS while the worker searches.
+    Each ``tick`` appends the batches that are ready to the run's ``EventLog`` and
+    applies up to ``stepsPerFrame`` steps of it, or ``FRAME_BUDGET_NS`` of them in
+    instant mode. A paused run takes no batches, so the worker stalls once its queue
+    fills. The board must not be edited until the run is finished or cancelled.
+    """
+
+    def __init__(self, board, start, end, name):
+        self.t0 = time.perf_counter_ns()
+        self.board, self.start, self.end = board, start, end
+        self.metrics = RunMetrics(name)
+        self.log = EventLog(array("i"), bytearray(), board.cols, board.rows, start, end, name)
+        self.applied = 0  # log events already on the board
+        self.ended = self.paused = False
+        self.stream = SearchStream(ALGORITHMS[name]["search"], board.layout, start, end)
+
+    def take(self):
+        cells, states = self.log.cells, self.log.states
+        while not self.ended:
+            try:
+                batch = self.stream.take()
+            except queue.Empty:
+                return
+            if batch is None:
+                self.ended = True
+            else:
+                cells.extend(batch[0])
+                states.extend(batch[1])
+
+    def done(self): return self.ended and self.applied == len(self.log)
+
+    def tick(self, stepsPerFrame):
+        if self.paused: return
+        t = time.perf_counter_ns()
+        self.take()
+        cells, states, board = self.log.cells, self.log.states, self.board
+        count = 0
+        while self.applied < len(cells):
+            idx, state = cells[self.applied], states[self.applied]
+            if idx != self.start and idx != self.end:
+                board.mark(idx, state)
+            self.applied += 1
+            if state not in STEP_STATES: continue
+            count += 1
+            if stepsPerFrame is None:
+                if time.perf_counter_ns() - t >= FRAME_BUDGET_NS: break
+            elif count >= stepsPerFrame: break
+        self.metrics.add("render", t)
+
+    def finish(self):
+        """The finished run's ``RunMetrics``; its result and events go into the query cache."""
+        if self.stream.error is not None: raise self.stream.error
+        result, metrics, log = self.stream.result, self.metrics, self.log
+        result.stats["time"] = self.stream.searchNs / 1e9  # as solver.record reports it
+        metrics.ns["search"] = self.stream.searchNs
+        queryCache(self.board.layout).put(self.start, self.end, log.algorithm, result, log.cells, log.states)
+        metrics.wallNs = time.perf_counter_ns() - self.t0
+        return metrics.finish(result)
+
+    def cancel(self):
+        """Stop the search; returns the log of the events shown so far."""
+        self.stream.cancel()
+        log = self.log
+        return EventLog(log.cells[:self.applied], log.states[:self.applied], log.width, log.height,
+                        log.start, log.end, log.algorithm)
+
+    def label(self):
+        status = "paused" if self.paused else "searching" if not self.ended else "drawing"
+        return f"Run: {self.log.algorithm} {self.applied}/{len(self.log)} events ({status})"
+
+def applier(board, start, end):
+    def apply(idx, state):
+        if idx != start and idx != end:
+            board.mark(idx, state)
+    return apply
+
+def runAlgorithm(draw, board, start, end, name, scheduler, useCache=True):
+    """Animate ``name`` from ``start`` to ``end``; returns the run's ``RunMetrics`` and ``EventLog``.
+
+    With ``useCache`` off the search always runs (a profiled run must not be a redraw); its result is still cached.
+    """
+    t0 = time.perf_counter_ns()
+    metrics = RunMetrics(name)
+    cache = queryCache(board.layout)
+    hit = cache.get(start, end, name) if useCache else None
+    if hit is not None:
+        result, cells, states = hit
+        show(draw, board, start, end, cells, states)
+        metrics.cached = True
+        metrics.add("render", t0)
+        metrics.wallNs = time.perf_counter_ns() - t0
+        return metrics.finish(result), EventLog(cells, states, board.cols, board.rows, start, end, name)
+    cells, states, apply = array("i"), bytearray(), applier(board, start, end)
+
+    def applyAndRecord(idx, state):
+        cells.append(idx)
+        states.append(state)
+        apply(idx, state)
+
+    trace = Trace(ALGORITHMS[name]["search"](board.layout, start, end, trace=True))
+    scheduler.run(trace, applyAndRecord, draw, metrics)
+    trace.result.stats["time"] = metrics.ns["search"] / 1e9  # as solver.record reports it
+    cache.put(start, end, name, trace.result, cells, states)
+    metrics.wallNs = time.perf_counter_ns() - t0
+    return metrics.finish(trace.result), EventLog(cells, states, board.cols, board.rows, start, end, name)
+
+def replay(draw, board, start, end, cells, states, scheduler, metrics):
+    # animate events recorded by solver.record without searching again
+    scheduler.run(zip(cells, states), applier(board, start, end), draw, metrics)
+
+def show(draw, board, start, end, cells, states):
+    # the same events in one go: a cached run is redrawn, not animated
+    apply = applier(board, start, end)
+    for idx, state in zip(cells, states):
+        apply(idx, state)
+    draw()
+
+def compareAll(draw, layout, start, end, pool):
+    """Run every algorithm at once in ``pool``, skipping cached ones.
+
+    Returns {name: (result, cells, states)}, the names answered from the cache, and the wall time in ns.
+    """
+    t0 = time.perf_counter_ns()
+    cache = queryCache(layout)
+    runs = {name: cache.get(start, end, name) for name in ALGORITHMS}
+    cached = {name for name, hit in runs.items() if hit is not None}
+    jobs = {}
+    if len(cached) < len(ALGORITHMS):
+        # the layout goes to the workers once, through shared memory, instead of pickled into every job
+        memory, key = solver.shareGrid(layout)
+        try:
+            jobs = {name: pool.submit(solver.recordShared, key, start, end, config["search"])
+                    for name, config in ALGORITHMS.items() if name not in cached}
+            pending = set(jobs.values())
+            while pending:
+                _, pending = wait(pending, timeout=1 / FPS)
+                for event in pygame.event.get():
+                    if event.type == pygame.QUIT:
+                        pygame.quit()
+                        quit()
+                draw()
+        finally:
+            memory.close()
+            memory.unlink()
+    for name, job in jobs.items():
+        runs[name] = job.result()
+        cache.put(start, end, name, *runs[name])
+    return runs, cached, time.perf_counter_ns() - t0
+
+def replayRun(draw, board, start, end, name, run, cached, wallNs, scheduler):
+    """Show one of ``compareAll``'s runs; returns its ``RunMetrics`` and ``EventLog``."""
+    result, cells, states = run
+    t0 = time.perf_counter_ns()
+    metrics = RunMetrics(name)
+    metrics.ns["search"] = round(result.stats["time"] * 1e9)  # measured in the worker
+    metrics.cached = cached
+    if cached:
+        show(draw, board, start, end, cells, states)
+        metrics.add("render", t0)
+    else:
+        replay(draw, board, start, end, cells, states, scheduler, metrics)
+    metrics.wallNs = wallNs + time.perf_counter_ns() - t0
+    return metrics.finish(result), EventLog(cells, states, board.cols, board.rows, start, end, name)
+
+def makeGrid(rows, cols):
+    return Board(rows, cols)
+
+def loadBoard(path):
+    layout = gridfile.openGrid(path)
+    states = None
+    if layout.weights is None and isinstance(layout.cells, memoryview):
+        states = gridfile.load(path).cells  # a second copy-on-write mapping: stays lazy too
+    return Board(layout.height, layout.width, layout, states)
+
+class Camera:
+    """Maps the grid area to cells: ``x``, ``y`` is the (fractional) cell at its top-left corner."""
+
+    def __init__(self, rows, cols):
+        self.rows, self.cols = rows, cols
+        self.fit()
+
+    def fit(self):
+        # whole grid in view; whole pixels per cell when cells are at least a pixel wide
+        scale = min(WINDOW_WIDTH / self.cols, GRID_HEIGHT / self.rows)
+        self.scale = max(1, int(scale)) if scale >= 1 else scale
+        self.x = self.y = 0.0
+        self.minScale = min(self.scale, 1)
+
+    def key(self): return self.x, self.y, self.scale
+
+    def clamp(self):
+        self.x = min(max(self.x, 0.0), max(0.0, self.cols - WINDOW_WIDTH / self.scale))
+        self.y = min(max(self.y, 0.0), max(0.0, self.rows - GRID_HEIGHT / self.scale))
+
+    def pan(self, dx, dy):
+        self.x -= dx / self.scale
+        self.y -= dy / self.scale
+        self.clamp()
+
+    def zoom(self, factor, pos):
+        # keep the cell under the cursor where it is
+        px, py = pos[0], pos[1] - HEADER_HEIGHT
+        cellX, cellY = self.x + px / self.scale, self.y + py / self.scale
+        self.scale = min(max(self.scale * factor, self.minScale), MAX_ZOOM)
+        self.x, self.y = cellX - px / self.scale, cellY - py / self.scale
+        self.clamp()
+
+def formatTimes(metrics):
+    return f"{metrics.ns['search'] / 1e6:.1f}/{metrics.wallNs / 1e6:.0f}ms" + (" (cached)" if metrics.cached else "")
+
+def wrapSegments(font, segments, width):
+    # join segments with " | ", starting a new line whenever the next one would not fit
+    lines = []
+    for segment in segments:
+        if lines and font.size(f"{lines[-1]} | {segment}")[0] <= width:
+            lines[-1] = f"{lines[-1]} | {segment}"
+        else:
+            lines.append(segment)
+    return lines
+
+def drawFrameGraph(win, frameTimes):
+    # one column per frame with its phases stacked; the line marks a full frame at FPS, the top two
+    win.fill((20, 20, 40), GRAPH)
+    scale = GRAPH.height / (2e9 / FPS)
+    x = GRAPH.right - len(frameTimes.frames)
+    for frame in frameTimes.frames:
+        y = GRAPH.bottom
+        for ns, color in zip(frame, GRAPH_COLORS):
+            height = min(round(ns * scale), y - GRAPH.top)
+            if height > 0:
+                win.fill(color, (x, y - height, 1, height))
+                y -= height
+        x += 1
+    budget = GRAPH.bottom - GRAPH.height // 2
+    pygame.draw.line(win, GREY, (GRAPH.left, budget), (GRAPH.right - 1, budget))
+
+def drawHeader(win, font, selection, times, speed, brush, zoom, last, profile, playback):
     pygame.draw.rect(win, (30, 30, 60), (0, 0, WINDOW_WIDTH, HEADER_HEIGHT))
     pygame.draw.line(win, CYAN, (0, HEADER_HEIGHT-1), (WINDOW_WIDTH, HEADER_HEIGHT-1))
     pygame.draw.line(win, (0, 180, 255), (0, HEADER_HEIGHT-2), (WINDOW_WIDTH, HEADER_HEIGHT-2))
 
-    options = ' | '.join([f"[{pygame.key.name(v['key']).upper()}] {k}" for k, v in ALGORITHMS.items()])
-    lines = [
-        f"{options} | [0] Compare | [C] Clear",
-        f"Selected: {selection or '---'} " + ' | '.join([f"{k}: {times.get(k.lower(), '---')}s" for k in ALGORITHMS])
-    ]
+    byKey = sorted(ALGORITHMS.items(), key=lambda item: (item[1]["key"] is None, item[1]["key"] or 0))  # key order, unkeyed last
+    options = [f"[{pygame.key.name(v['key']).upper()}] {k}" if v["key"] else f"{k} (in Compare)" for k, v in byKey]
+    options += ["[0] Compare", "[C] Clear", f"[F1-F4] Speed: {speed}", f"[B/M/W] Brush: {brush}",
+                f"[Wheel/Home] Zoom: {zoom:.2g}px", "[Middle drag/Arrows] Pan", "[S] Save",
+                f"[P] Profile: {profile}"]
+    results = [f"Selected: {selection or '---'} (search/total)"]
+    results += [f"{k}: {formatTimes(times[k.lower()])}" for k in ALGORITHMS if k.lower() in times]
+    details = last.summary().split(" | ") if last is not None else []
+    if playback: details.append(playback)
+    narrow = GRAPH.left - 30  # the frame graph sits to the right of the results
+    lines = wrapSegments(font, options, WINDOW_WIDTH - 40) + wrapSegments(font, results, narrow) + wrapSegments(font, details, narrow)
     for idx, text in enumerate(lines):
-        surf = FONT.render(text, True, (255, 255, 255))
-        win.blit(surf, (20, 5 + idx * 24))
-
-def draw(win, grid, headerSel, headerTimes):
-    win.fill(WHITE)
-    drawHeader(win, headerSel, headerTimes)
-    for row in grid:
-        for spot in row:
-            spot.draw(win)
-    drawGrid(win, ROWS, WINDOW_WIDTH)
-    pygame.display.update()
-
-def getClickedPos(pos):
+        surf = font.render(text, True, (255, 255, 255))
+        win.blit(surf, (20, 5 + idx * 22))
+
+def makeLineLayer(origin, size, columns, rows, scale):
+    # transparent overlay with every cell border in view, blitted over the cells instead of drawing lines each frame
+    layer = pygame.Surface((WINDOW_WIDTH, GRID_HEIGHT), pygame.SRCALPHA)
+    left, top = origin[0], origin[1] - HEADER_HEIGHT
+    right, bottom = left + size[0], top + size[1]
+    for col in range(columns + 1):
+        x = left + round(col * scale)
+        pygame.draw.line(layer, GREY, (x, top), (x, bottom))
+    for row in range(rows + 1):
+        y = top + round(row * scale)
+        pygame.draw.line(layer, GREY, (left, y), (right, y))
+    return layer
+
+class Renderer:
+    """Redraws only what changed: the header text, the cells the board repainted, or everything after a camera move.
+
+    A full redraw cuts the visible cells out of ``board.states`` row by row (every
+    ``step``-th cell when zoomed out past one cell per pixel), wraps them in an 8-bit
+    surface with ``PALETTE`` and scales it up to the camera's zoom, so a frame costs
+    the same for a 50x50 grid as for a 10,000x10,000 one. Between camera moves, up to
+    ``DIRTY_LIMIT`` changed cells are refilled one by one where that scaling put them.
+    Cell borders come from an overlay that is rebuilt only when the camera moves.
+    """
+
+    def __init__(self, win, frameTimes):
+        self.win = win
+        self.font = pygame.font.SysFont(*FONT)
+        self.frameTimes = frameTimes
+        self.graphed = -1  # frameTimes.count when the graph was last drawn
+        self.header = None
+        self.view = None
+        self.cellLayout = None  # r0, c0, rows, columns, origin, size of the last full draw; None when zoomed out
+        self.lines = self.linesKey = None
+        self.full = True
+
+    def invalidate(self): self.full = True  # next frame repaints the whole window
+
+    def drawCells(self, board, camera):
+        scale, cols = camera.scale, board.cols
+        step = max(1, int(1 / scale))  # cells per sampled pixel
+        r0, c0 = int(camera.y), int(camera.x)
+        r1 = min(board.rows, r0 + int(GRID_HEIGHT / scale) + 2)
+        c1 = min(cols, c0 + int(WINDOW_WIDTH / scale) + 2)
+        states = board.states
+        rows = [states[r * cols + c0:r * cols + c1:step] for r in range(r0, r1, step)]
+        area = pygame.Rect(0, HEADER_HEIGHT, WINDOW_WIDTH, GRID_HEIGHT)
+        self.win.fill((40, 40, 40), area)
+        self.cellLayout = None
+        if not rows or not rows[0]: return
+        data = b"".join(rows)
+        cells = pygame.image.frombuffer(data, (len(rows[0]), len(rows)), "P")
+        cells.set_palette(PALETTE)
+        size = (round(len(rows[0]) * step * scale), round(len(rows) * step * scale))
+        origin = (round((c0 - camera.x) * scale), HEADER_HEIGHT + round((r0 - camera.y) * scale))
+        self.win.set_clip(area)
+        self.win.blit(pygame.transform.scale(cells, size), origin)
+        if step == 1: self.cellLayout = (r0, c0, len(rows), len(rows[0]), origin, size)
+        if scale >= GRID_LINES_ZOOM:
+            key = (camera.key(), board.rows, board.cols)
+            if key != self.linesKey:
+                self.lines, self.linesKey = makeLineLayer(origin, size, c1 - c0, r1 - r0, scale), key
+            self.win.blit(self.lines, area)
+        else:
+            self.lines = self.linesKey = None
+        self.win.set_clip(None)
+
+    def drawChanged(self, board, changed):
+        # refill just these cells, where the last full draw's scaling put them; returns their screen rects
+        r0, c0, rows, columns, (left, top), (width, height) = self.cellLayout
+        area = pygame.Rect(0, HEADER_HEIGHT, WINDOW_WIDTH, GRID_HEIGHT)
+        states, rects = board.states, []
+        for idx in set(changed):
+            r, c = divmod(idx, board.cols)
+            r, c = r - r0, c - c0
+            if not (0 <= r < rows and 0 <= c < columns): continue
+            # pygame.transform.scale shows cell x * columns // width at pixel x: a cell starts at the ceiling of its edge
+            x, y = left - (-c * width // columns), top - (-r * height // rows)
+            right, bottom = left - (-(c + 1) * width // columns), top - (-(r + 1) * height // rows)
+            rect = pygame.Rect(x, y, right - x, bottom - y).clip(area)
+            if not rect: continue
+            self.win.fill(PALETTE[states[idx]], rect)
+            if self.lines is not None:
+                self.win.blit(self.lines, rect, rect.move(0, -HEADER_HEIGHT))
+            rects.append(rect)
+        return rects
+
+    def draw(self, board, camera, headerSel, headerTimes, speed, brush, last=None, profile="off", playback=""):
+        """Repaint what changed; returns True if the header text or any cells were redrawn."""
+        header = (headerSel, tuple(headerTimes.items()), speed, brush, round(camera.scale, 3), last, profile, playback)
+        view = (id(board), camera.key())
+        changed = board.takeChanged()
+        rects = []
+        if self.full or header != self.header:
+            drawHeader(self.win, self.font, headerSel, headerTimes, speed, brush, camera.scale, last, profile, playback)
+            self.graphed = -1
+            rects.append(pygame.Rect(0, 0, WINDOW_WIDTH, HEADER_HEIGHT))
+            self.header = header
+        if self.full or view != self.view or len(changed) > DIRTY_LIMIT or (changed and self.cellLayout is None):
+            self.drawCells(board, camera)
+            rects.append(pygame.Rect(0, HEADER_HEIGHT, WINDOW_WIDTH, GRID_HEIGHT))
+            self.view = view
+        elif changed:
+            rects += self.drawChanged(board, changed)
+        drew = bool(rects)
+        if self.graphed != self.frameTimes.count:
+            drawFrameGraph(self.win, self.frameTimes)
+            rects.append(GRAPH)
+            self.graphed = self.frameTimes.count
+        self.full = False
+        if rects:
+            pygame.display.update(rects)
+        return drew
+
+def getClickedPos(pos, camera):
     x, y = pos
     if y < HEADER_HEIGHT: return None, None
-    size = WINDOW_WIDTH // ROWS
-    return (y - HEADER_HEIGHT) // size, x // size
-
-def clearSearch(grid):
-    for row in grid:
-        for spot in row:
-            if not (spot.isStart() or spot.isEnd() or spot.isBarrier()):
-                spot.reset()
-
-def main():
-    grid = makeGrid(ROWS, WINDOW_WIDTH)
+    row, col = int(camera.y + (y - HEADER_HEIGHT) / camera.scale), int(camera.x + x / camera.scale)
+    if not (0 <= row < camera.rows and 0 <= col < camera.cols): return None, None
+    return row, col
+
+def parseArgs(argv=None):
+    parser = argparse.ArgumentParser(description="Pathfinding Visualizer")
+    parser.add_argument("--rows", type=int, default=ROWS)
+    parser.add_argument("--cols", type=int, help="defaults to --rows")
+    parser.add_argument("--map", metavar="PATH", help="open a saved grid or a MovingAI .map file")
+    parser.add_argument("--save", metavar="PATH", default="grid.pfg", help="where S saves the grid (default grid.pfg)")
+    parser.add_argument("--metrics", metavar="PATH", help="append one JSON line of timings and counters per run")
+    parser.add_argument("--profile", action="store_true", help="profile every search (cProfile + tracemalloc)")
+    parser.add_argument("--log", metavar="PATH", help="play back a saved search event log (on the same grid)")
+    parser.add_argument("--save-log", metavar="PATH", default="search.pflog", help="where L saves the latest search's log")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parseArgs(argv)
+    pygame.init()
+    newBoard = lambda: loadBoard(args.map) if args.map else makeGrid(args.rows, args.cols or args.rows)
+    win = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+    pygame.display.set_caption("Pathfinding Visualizer")
+    # spawned (not forked) workers: they must not inherit the display
+    pool = ProcessPoolExecutor(max_workers=len(ALGORITHMS), mp_context=multiprocessing.get_context("spawn"))
+    board = newBoard()
+    camera = Camera(board.rows, board.cols)
+    frameTimes = FrameTimes()
+    renderer = Renderer(win, frameTimes)
+    scheduler = Scheduler(frameTimes)
+    profile = "every" if args.profile else "off"  # "next" profiles one search, armed with P
     start = end = None
     algoSelection = ""
-    times = {}
+    times = {}  # algorithm name (lower case) -> RunMetrics of its latest run
+    last = None  # the most recent RunMetrics, detailed in the header
+    logRun = lambda metrics: appendJsonl(args.metrics, metrics.record()) if args.metrics else None
+    brush = pygame.K_b
+    player = None  # playback of the latest search's event log
+    live = None  # the search running on its worker thread, if any
+    if args.log:
+        log = eventlog.load(args.log)
+        if (log.width, log.height) == (board.cols, board.rows):
+            start, end = log.start, log.end
+            board.paint(start, START)
+            board.paint(end, END)
+            player = Player(board, log)
+            player.playing = True
+        else:
+            print(f"{args.log} was recorded on a {log.width}x{log.height} grid, not {board.cols}x{board.rows}")
+    def status():
+        if live is not None: return f"{live.label()} [Space/Esc]"
+        return f"{player.label()} [Space/R/,/./PgUp/PgDn/L]" if player is not None else ""
+    redraw = lambda: renderer.draw(board, camera, algoSelection, times, scheduler.label(), BRUSHES[brush][0], last,
+                                   profile, status())
     run = True
 
     while run:
-        draw(win, grid, algoSelection, times)
-
-        for event in pygame.event.get():
+        t0 = time.perf_counter_ns()
+        searched = 0  # worker time since the last frame, for the graph
+        if live is not None:
+            searched = live.stream.searchNs
+            live.tick(scheduler.stepsPerFrame)
+            searched = live.stream.searchNs - searched
+            if live.done():
+                last = times[live.metrics.algorithm.lower()] = live.finish()
+                player = Player(board, live.log, len(live.log))
+                logRun(last)
+                live = None
+        elif player is not None and player.playing:
+            player.tick(scheduler.stepsPerFrame)
+        t = time.perf_counter_ns()
+        drew = redraw()
+        t1 = time.perf_counter_ns()
+        scheduler.clock.tick(FPS)
+        t2 = time.perf_counter_ns()
+        events = pygame.event.get()
+        t3 = time.perf_counter_ns()
+        if live is not None:
+            live.metrics.ns["render"] += t1 - t
+            live.metrics.ns["events"] += t3 - t2
+        if drew:  # idle frames that only waited would flatten the graph
+            frameTimes.push(searched, t1 - t0, t3 - t2)
+
+        for event in events:
             if event.type == pygame.QUIT:
                 run = False
-
-            if pygame.mouse.get_pressed()[0]:
-                row, col = getClickedPos(pygame.mouse.get_pos())
+            if event.type == pygame.VIDEOEXPOSE:
+                renderer.invalidate()
+            if event.type == pygame.MOUSEWHEEL:
+                camera.zoom(ZOOM_STEP ** event.y, pygame.mouse.get_pos())
+                continue
+            if event.type == pygame.MOUSEMOTION and event.buttons[1]:
+                camera.pan(*event.rel)
+                continue
+
+            # while a live run is going the worker is reading the grid: no edits until it is done
+            if live is None and pygame.mouse.get_pressed()[0]:
+                row, col = getClickedPos(pygame.mouse.get_pos(), camera)
                 if row is None: continue
-                spot = grid[row][col]
-                if not start and spot != end:
-                    start = spot
-                    start.makeStart()
-                elif not end and spot != start:
-                    end = spot
-                    end.makeEnd()
-                elif spot != start and spot != end:
-                    spot.makeBarrier()
-
-            elif pygame.mouse.get_pressed()[2]:
-                row, col = getClickedPos(pygame.mouse.get_pos())
+                idx = board.layout.index(row, col)
+                if start is None and idx != end:
+                    start = idx
+                    board.paint(start, START)
+                elif end is None and idx != start:
+                    end = idx
+                    board.paint(end, END)
+                elif idx != start and idx != end:
+                    cost = BRUSHES[brush][1]
+                    if cost is None: board.paint(idx, BARRIER)
+                    else: board.setTerrain(idx, cost)
+                    player = None  # its log no longer matches the board
+
+            elif live is None and pygame.mouse.get_pressed()[2]:
+                row, col = getClickedPos(pygame.mouse.get_pos(), camera)
                 if row is None: continue
-                spot = grid[row][col]
-                if spot == start: start = None
-                elif spot == end: end = None
-                spot.reset()
-
-            if event.type == pygame.KEYDOWN and start and end:
-                clearSearch(grid)
-                for rowList in grid:
-                    for spot in rowList:
-                        spot.updateNeighbors(grid)
+                idx = board.layout.index(row, col)
+                if idx == start: start = None
+                elif idx == end: end = None
+                board.erase(idx)
+                player = None
+
+            if event.type == pygame.KEYDOWN and scheduler.setSpeed(event.key):
+                continue
+            if event.type == pygame.KEYDOWN and event.key in BRUSHES:
+                brush = event.key
+                continue
+            if event.type == pygame.KEYDOWN and event.key in PAN_KEYS:
+                camera.pan(*PAN_KEYS[event.key])
+                continue
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_HOME:
+                camera.fit()
+                continue
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_p:
+                profile = "next" if profile == "off" else "off"
+                continue
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_s:
+                gridfile.save(board.layout, args.save)
+                pygame.display.set_caption(f"Pathfinding Visualizer - saved {args.save}")
+                continue
+            if event.type == pygame.KEYDOWN and live is not None and event.key in RUN_KEYS:
+                if event.key == pygame.K_SPACE:
+                    live.paused = not live.paused
+                else:
+                    log = live.cancel()
+                    algoSelection = f"{log.algorithm} - cancelled"
+                    player = Player(board, log, len(log))
+                    live = None
+                continue
+            if event.type == pygame.KEYDOWN and player is not None and event.key in PLAYBACK_KEYS:
+                if event.key == pygame.K_SPACE:
+                    player.playing = not player.playing and not player.atEnd()
+                elif event.key == pygame.K_r:
+                    player.rewind()
+                    player.playing = True
+                elif event.key in (pygame.K_COMMA, pygame.K_PERIOD):
+                    player.playing = False
+                    if event.key == pygame.K_PERIOD: player.forward(1)
+                    else: player.backward(1)
+                elif event.key in (pygame.K_PAGEUP, pygame.K_PAGEDOWN):
+                    player.scrub(1 if event.key == pygame.K_PAGEDOWN else -1)
+                elif event.key == pygame.K_l:
+                    player.log.save(args.save_log)
+                    pygame.display.set_caption(f"Pathfinding Visualizer - saved {args.save_log}")
+                continue
+
+            if event.type == pygame.KEYDOWN and start is not None and end is not None:
+                if live is not None:
+                    live.cancel()
+                    live = None
+                board.clearSearch()
+                player = None
+
+                # different regions: no search can succeed, so don't animate one
+                unreachable = not connected(board.layout, start, end)
 
                 if event.key == pygame.K_0:
-                    algoSelection = "Compare"
-                    for name, config in ALGORITHMS.items():
-                        clearSearch(grid)
-                        start.makeStart(); end.makeEnd()
-                        for rowList in grid:
-                            for spot in rowList:
-                                spot.updateNeighbors(grid)
-                        t0 = time.time()
-                        runAlgorithm(lambda: draw(win, grid, algoSelection, times), grid, start, end, config["h"])
-                        times[name.lower()] = round(time.time() - t0, 4)
+                    algoSelection = "Compare - no path" if unreachable else "Compare"
+                    if unreachable: continue
+                    with profiled("Compare", profile != "off"):  # the workers' searches are not profiled
+                        runs, cached, wall = compareAll(redraw, board.layout, start, end, pool)
+                        for name, answer in runs.items():
+                            board.clearSearch()
+                            last, log = replayRun(redraw, board, start, end, name, answer, name in cached, wall, scheduler)
+                            times[name.lower()] = last
+                            player = Player(board, log, len(log))
+                            logRun(last)
+                    if profile == "next": profile = "off"
 
                 else:
                     for name, config in ALGORITHMS.items():
                         if event.key == config["key"]:
-                            algoSelection = name
-                            t0 = time.time()
-                            runAlgorithm(lambda: draw(win, grid, algoSelection, times), grid, start, end, config["h"])
-                            times[name.lower()] = round(time.time() - t0, 4)
+                            algoSelection = f"{name} - no path" if unreachable else name
+                            if unreachable: break
+                            if profile == "off" and (start, end, name) not in queryCache(board.layout):
+                                live = LiveRun(board, start, end, name)  # finished by the loop above
+                                break
+                            # cached runs are redrawn at once; profiled ones search on this thread, where the profiler is
+                            with profiled(name, profile != "off"):
+                                last, log = runAlgorithm(redraw, board, start, end, name, scheduler, profile == "off")
+                            times[name.lower()] = last
+                            player = Player(board, log, len(log))
+                            logRun(last)
+                            if profile == "next": profile = "off"
                             break
 
             if event.type == pygame.KEYDOWN and event.key == pygame.K_c:
+                if live is not None:
+                    live.cancel()
+                    live = None
                 start = end = None
                 algoSelection = ""
                 times.clear()
-                grid = makeGrid(ROWS, WINDOW_WIDTH)
+                last = player = None
+                board = newBoard()
 
+    if live is not None: live.cancel()
+    pool.shutdown(cancel_futures=True)
     pygame.quit()
 
-main()
-
-
-
+if __name__ == "__main__":
+    main()
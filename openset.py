@@ -0,0 +1,136 @@
+"""Open set for best-first searches: a ``heapq`` binary heap with lazy invalidation.
+
+Lowering an item's priority pushes a fresh heap entry instead of searching the heap
+for the old one; superseded entries stay behind and are skipped when they surface.
+Items can be anything hashable (flat cell indices, ``Spot`` objects); they are never
+compared with each other, ties go first-in first-out.
+
+``BucketQueue`` has the same interface for Dijkstra with small integer edge costs
+(Dial's algorithm): one list per key, so push and pop are O(1) instead of O(log n).
+"""
+
+from heapq import heappush, heappop
+
+
+class OpenSet:
+    def __init__(self):
+        self.heap = []
+        self.priority = {}  # live priority of every item currently in the set
+        self.count = 0
+        self.pushes = self.pops = self.decreases = self.stalePops = self.peak = 0
+
+    def __len__(self): return len(self.priority)
+    def __bool__(self): return bool(self.priority)
+    def __contains__(self, item): return item in self.priority
+
+    def push(self, item, priority):
+        """Add ``item``, or lower its priority if it is already open. Returns False if nothing changed."""
+        current = self.priority.get(item)
+        if current is not None:
+            if priority >= current: return False
+            self.decreases += 1
+        self.priority[item] = priority
+        self.count += 1
+        heappush(self.heap, (priority, self.count, item))
+        self.pushes += 1
+        if len(self.priority) > self.peak: self.peak = len(self.priority)
+        return True
+
+    def pop(self):
+        """Remove and return the item with the lowest priority."""
+        heap, live = self.heap, self.priority
+        while heap:
+            priority, _, item = heappop(heap)
+            if live.get(item) == priority:
+                del live[item]
+                self.pops += 1
+                return item
+            self.stalePops += 1
+        raise IndexError("pop from an empty OpenSet")
+
+    def discard(self, item):
+        """Drop ``item`` if it is open; its heap entry goes stale."""
+        self.priority.pop(item, None)
+
+    def peek(self):
+        """Lowest live priority, without removing its item."""
+        heap, live = self.heap, self.priority
+        while heap and live.get(heap[0][2]) != heap[0][0]:
+            heappop(heap)  # discard stale entries sitting on top
+            self.stalePops += 1
+        if not heap: raise IndexError("peek at an empty OpenSet")
+        return heap[0][0]
+
+    def stats(self):
+        return {"pushes": self.pushes, "pops": self.pops, "decreases": self.decreases,
+                "stalePops": self.stalePops, "peakOpen": self.peak}
+
+
+class BucketQueue:
+    """Monotone integer priority queue: a ring of ``span`` buckets, one per key.
+
+    Keys may never drop below the last popped key, and every push must be less than
+    ``span`` above it; Dijkstra with edge costs below ``span`` satisfies both. Like
+    ``OpenSet``, superseded entries stay in their bucket and are skipped on pop.
+    Within a bucket, the most recently pushed item comes out first.
+    """
+
+    def __init__(self, span=256):
+        self.buckets = [[] for _ in range(span)]
+        self.span = span
+        self.cursor = 0  # no live key is below this
+        self.priority = {}
+        self.pushes = self.pops = self.decreases = self.stalePops = self.peak = 0
+
+    def __len__(self): return len(self.priority)
+    def __bool__(self): return bool(self.priority)
+    def __contains__(self, item): return item in self.priority
+
+    def push(self, item, priority):
+        """Add ``item``, or lower its priority if it is already open. Returns False if nothing changed."""
+        current = self.priority.get(item)
+        if current is not None:
+            if priority >= current: return False
+            self.decreases += 1
+        span = self.span
+        if not 0 <= priority - self.cursor < span:
+            raise ValueError(f"priority {priority} outside [{self.cursor}, {self.cursor + span})")
+        self.priority[item] = priority
+        self.buckets[priority % span].append(item)
+        self.pushes += 1
+        if len(self.priority) > self.peak: self.peak = len(self.priority)
+        return True
+
+    def pop(self):
+        """Remove and return an item with the lowest priority."""
+        buckets, live, span, key = self.buckets, self.priority, self.span, self.cursor
+        if not live: raise IndexError("pop from an empty BucketQueue")
+        while True:
+            bucket = buckets[key % span]
+            while bucket:
+                item = bucket.pop()
+                if live.get(item) == key:
+                    del live[item]
+                    self.cursor = key
+                    self.pops += 1
+                    return item
+                self.stalePops += 1
+            key += 1
+
+    def peek(self):
+        """Lowest live priority, without removing its item."""
+        if not self.priority: raise IndexError("peek at an empty BucketQueue")
+        buckets, live, span, key = self.buckets, self.priority, self.span, self.cursor
+        while True:
+            bucket = buckets[key % span]
+            while bucket and live.get(bucket[-1]) != key:
+                bucket.pop()  # superseded entry
+                self.stalePops += 1
+            if bucket:
+                self.cursor = key
+                return key
+            key += 1
+
+    def stats(self):
+        return {"pushes": self.pushes, "pops": self.pops, "decreases": self.decreases,
+                "stalePops": self.stalePops, "peakOpen": self.peak}
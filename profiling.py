@@ -0,0 +1,61 @@
+"""Profile one block of work with cProfile and tracemalloc at once.
+
+    with Profiler() as profiler:
+        solver.solve(grid, start, end)
+    print(profiler.report())
+
+The report lists the hottest functions by their own time and the source lines
+holding the most memory allocated inside the block that was still live at its end.
+Both tools slow the work down considerably; use it to find where time goes, not
+to measure how much. ``profiled`` does the same and prints the report itself.
+"""
+
+import cProfile
+import io
+import pstats
+import tracemalloc
+from contextlib import contextmanager
+
+TOP_FUNCTIONS = 25
+TOP_ALLOCATIONS = 10
+
+
+class Profiler:
+    def __init__(self, label="profile"):
+        self.label = label
+        self.profile = cProfile.Profile()
+        self.snapshot = None
+
+    def __enter__(self):
+        tracemalloc.start()
+        self.profile.enable()
+        return self
+
+    def __exit__(self, *exc):
+        self.profile.disable()
+        self.snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+        tracemalloc.stop()
+        return False
+
+    def report(self, functions=TOP_FUNCTIONS, allocations=TOP_ALLOCATIONS):
+        out = io.StringIO()
+        out.write(f"=== {self.label}: hot functions (by own time) ===\n")
+        pstats.Stats(self.profile, stream=out).sort_stats("tottime").print_stats(functions)
+        out.write(f"=== {self.label}: top allocations still live ===\n")
+        for stat in self.snapshot.statistics("lineno")[:allocations]:
+            out.write(f"{stat}\n")
+        return out.getvalue()
+
+
+@contextmanager
+def profiled(label, enabled=True):
+    """Profile the ``with`` block when ``enabled`` and print the report once it ends."""
+    if not enabled:
+        yield None
+        return
+    with Profiler(label) as profiler:
+        yield profiler
+    print(profiler.report(), flush=True)
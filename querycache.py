@@ -0,0 +1,156 @@
+"""Answers to repeated queries on an unchanged grid, without searching again.
+
+``QueryCache`` keeps finished searches keyed by ``(grid.version, start, end, algorithm)``,
+together with their recorded trace events when there are any, so a visualizer can
+redraw the explored cells too. Every barrier or weight edit bumps the version; older
+entries can never match again and are dropped on the next lookup. The rest are
+evicted least recently used first once their estimated size passes ``maxBytes``.
+
+``PathTree`` serves one start and many goals: a single Dijkstra over the whole grid
+keeps every cell's distance and parent, and each goal's path is a walk up the parents.
+
+Both live in ``grid.scratch``; get them with ``queryCache(grid)`` and ``pathTree(grid, start)``.
+"""
+
+from array import array
+from collections import OrderedDict, deque
+
+from openset import BucketQueue
+
+MAX_BYTES = 64 * 1024 * 1024
+INF = 0x7FFFFFFF
+INT_BYTES = 36  # a list slot plus a small int object
+
+
+def footprint(result, cells, states):
+    size = len(result.path) * INT_BYTES
+    if cells is not None: size += len(cells) * cells.itemsize + len(states)
+    return size
+
+
+class QueryCache:
+    def __init__(self, grid, maxBytes=MAX_BYTES):
+        self.grid, self.maxBytes = grid, maxBytes
+        self.version = grid.version
+        self.entries = OrderedDict()  # key -> (result, cells, states, size), oldest use first
+        self.bytes = 0
+        self.hits = self.misses = self.evictions = 0
+
+    def key(self, start, end, algorithm):
+        if self.grid.version != self.version:  # the grid changed: nothing cached can hit any more
+            self.entries.clear()
+            self.bytes, self.version = 0, self.grid.version
+        return (self.version, start, end, algorithm)
+
+    def get(self, start, end, algorithm):
+        """``(result, cells, states)`` for a query answered on this exact grid, else None."""
+        key = self.key(start, end, algorithm)
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry[:3]
+
+    def __contains__(self, query):
+        # (start, end, algorithm); unlike get, neither counted nor refreshed
+        return self.key(*query) in self.entries
+
+    def put(self, start, end, algorithm, result, cells=None, states=None):
+        """Remember a finished search; ``cells``/``states`` are its events as ``solver.record`` packs them."""
+        key = self.key(start, end, algorithm)
+        size = footprint(result, cells, states)
+        if size > self.maxBytes: return  # would evict everything and still not fit
+        old = self.entries.pop(key, None)
+        if old is not None: self.bytes -= old[3]
+        self.entries[key] = (result, cells, states, size)
+        self.bytes += size
+        while self.bytes > self.maxBytes:
+            _, (*_, dropped) = self.entries.popitem(last=False)
+            self.bytes -= dropped
+            self.evictions += 1
+
+    def stats(self):
+        return {"entries": len(self.entries), "bytes": self.bytes,
+                "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+
+def queryCache(grid):
+    cache = grid.scratch.get("queries")
+    if cache is None:
+        cache = grid.scratch["queries"] = QueryCache(grid)
+    return cache
+
+
+class PathTree:
+    """Shortest distances and parents from ``start`` to every reachable cell of ``grid``.
+
+    Given ``targets``, the tree stops growing once all of them are settled; only
+    cells settled by then (the targets among them) have final distances.
+    """
+
+    def __init__(self, grid, start, targets=None):
+        size = grid.width * grid.height
+        self.grid, self.start, self.version = grid, start, grid.version
+        self.dist = array("i", [INF]) * size
+        self.parent = array("i", [-1]) * size
+        self.dist[start] = 0
+        remaining = set(targets) if targets is not None else {-1}  # -1 is never settled: grow it all
+        remaining.discard(start)
+        if not remaining: return
+        if grid.isUniform(): self.flood(remaining)
+        else: self.grow(remaining)
+
+    def flood(self, remaining):
+        # unit costs: breadth-first order is distance order, so a cell is settled when first reached
+        grid, dist, parent = self.grid, self.dist, self.parent
+        queue = deque([self.start])
+        while queue:
+            current = queue.popleft()
+            d = dist[current] + 1
+            for neighbor in grid.neighbors(current):
+                if dist[neighbor] == INF:
+                    dist[neighbor], parent[neighbor] = d, current
+                    queue.append(neighbor)
+                    if neighbor in remaining:
+                        remaining.discard(neighbor)
+                        if not remaining: return
+
+    def grow(self, remaining):
+        grid, dist, parent, weights = self.grid, self.dist, self.parent, self.grid.weights
+        openSet = BucketQueue()
+        openSet.push(self.start, 0)
+        while openSet:
+            current = openSet.pop()
+            if current in remaining:
+                remaining.discard(current)
+                if not remaining: return
+            d = dist[current]
+            for neighbor in grid.neighbors(current):
+                tempD = d + weights[neighbor]
+                if tempD < dist[neighbor]:
+                    dist[neighbor], parent[neighbor] = tempD, current
+                    openSet.push(neighbor, tempD)
+
+    def distance(self, end):
+        """Total step cost from the start to ``end``, or None if it is unreachable."""
+        d = self.dist[end]
+        return d if d != INF else None
+
+    def path(self, end):
+        """Flat indices from the start to ``end``, empty if it is unreachable."""
+        if self.dist[end] == INF: return []
+        path, parent = [end], self.parent
+        while parent[path[-1]] >= 0:
+            path.append(parent[path[-1]])
+        path.reverse()
+        return path
+
+
+def pathTree(grid, start):
+    """The shortest-path tree from flat index ``start``, reused until the grid is edited."""
+    tree = grid.scratch.get("pathtree")
+    if tree is None or tree.start != start or tree.version != grid.version:
+        tree = grid.scratch["pathtree"] = PathTree(grid, start)
+    return tree
@@ -0,0 +1,127 @@
+"""Best-first searches (Dijkstra, Dial's bucket-queue Dijkstra and A*) over a ``grid.Grid``.
+
+Every search is a generator taking flat cell indices. With ``trace=True`` it yields
+``(index, state)`` pairs as cells are opened, closed and marked as path, so a
+visualizer can animate the run; with ``trace=False`` it yields nothing. Either way
+the generator returns a ``SearchResult``; wrap it in ``Trace`` to get at it.
+Stepping onto a cell costs its terrain weight (1 on unweighted grids).
+"""
+
+from array import array
+
+from grid import OPEN, CLOSED, PATH
+from openset import OpenSet, BucketQueue
+
+
+class SearchResult:
+    def __init__(self, path, stats):
+        self.path = path  # flat indices from start to end, empty when unreachable
+        self.stats = stats
+
+    @property
+    def found(self): return bool(self.path)
+
+    @property
+    def length(self): return len(self.path) - 1 if self.path else None
+
+
+class Trace:
+    """Iterate over a search's events and keep its ``SearchResult`` once exhausted."""
+
+    def __init__(self, steps):
+        self.steps = steps
+        self.result = None
+
+    def __iter__(self):
+        self.result = yield from self.steps
+
+
+def run(steps):
+    trace = Trace(steps)
+    for _ in trace:
+        pass
+    return trace.result
+
+
+class Workspace:
+    """g-score and parent buffers for every cell of a grid, allocated once and reused by each run.
+
+    A cell's entries only count when its stamp equals the current generation, so
+    starting a run is O(1) and never touches cells the search does not reach.
+    """
+
+    def __init__(self, size):
+        self.g = array("i", [0]) * size
+        self.parent = array("i", [-1]) * size
+        self.stamp = array("I", [0]) * size
+        self.generation = 0
+
+    def begin(self):
+        self.generation += 1
+        if self.generation > 0xFFFFFFFF:  # stamps would wrap around; start over
+            self.stamp = array("I", [0]) * len(self.stamp)
+            self.generation = 1
+        return self.generation
+
+
+def workspace(grid, slot=0):
+    # searches that need two sets of buffers at once (e.g. one per direction) use different slots
+    key = ("workspace", slot)
+    ws = grid.scratch.get(key)
+    if ws is None or len(ws.stamp) != grid.width * grid.height:
+        ws = grid.scratch[key] = Workspace(grid.width * grid.height)
+    return ws
+
+
+def buildPath(parent, end):
+    path = [end]
+    while parent[path[-1]] >= 0:
+        path.append(parent[path[-1]])
+    path.reverse()
+    return path
+
+
+def bestFirst(grid, start, end, useH, trace=False, queue=OpenSet):
+    width, weights = grid.width, grid.weights
+    endRow, endCol = divmod(end, width)
+    ws = workspace(grid)
+    gen, gScore, parent, stamp = ws.begin(), ws.g, ws.parent, ws.stamp
+
+    openSet = queue()
+    openSet.push(start, abs(start // width - endRow) + abs(start % width - endCol) if useH else 0)
+    gScore[start], parent[start], stamp[start] = 0, -1, gen
+    expanded = relaxations = 0
+
+    while openSet:
+        current = openSet.pop()
+
+        if current == end:
+            path = buildPath(parent, end)
+            if trace:
+                for idx in reversed(path[1:-1]):
+                    yield idx, PATH
+            return SearchResult(path, {"expanded": expanded, "relaxations": relaxations, **openSet.stats()})
+
+        expanded += 1
+        g = gScore[current]
+        for neighbor in grid.neighbors(current):
+            tempG = g + weights[neighbor] if weights is not None else g + 1
+            seen = stamp[neighbor] == gen
+            if not seen or tempG < gScore[neighbor]:
+                if trace and not seen:
+                    yield neighbor, OPEN
+                relaxations += 1
+                gScore[neighbor], parent[neighbor], stamp[neighbor] = tempG, current, gen
+                if useH:
+                    openSet.push(neighbor, tempG + abs(neighbor // width - endRow) + abs(neighbor % width - endCol))
+                else:
+                    openSet.push(neighbor, tempG)
+        if trace:
+            yield current, CLOSED
+
+    return SearchResult([], {"expanded": expanded, "relaxations": relaxations, **openSet.stats()})
+
+
+def dijkstra(grid, start, end, trace=False): return bestFirst(grid, start, end, False, trace)
+def astar(grid, start, end, trace=False): return bestFirst(grid, start, end, True, trace)
+def dial(grid, start, end, trace=False): return bestFirst(grid, start, end, False, trace, BucketQueue)
@@ -0,0 +1,115 @@
+"""Headless entry point: run any registered search on a ``grid.Grid`` without pygame.
+
+    from grid import Grid
+    import solver
+
+    result = solver.solve(Grid.fromRows(["...", ".#.", "..."]), (0, 0), (2, 2))
+    result.path, result.length, result.stats["expanded"]
+"""
+
+import time
+from array import array
+from multiprocessing import shared_memory
+
+from grid import Grid
+from search import SearchResult, Trace, run, dijkstra, astar, dial
+from jps import jps
+from bidirectional import biDijkstra, biAstar
+from dstar import dstarLite
+from components import connected
+from hpa import hpaStar
+from querycache import queryCache
+
+try:
+    from wavefront import wavefront
+except ImportError:  # NumPy is optional
+    wavefront = None
+
+ALGORITHMS = {
+    "Dijkstra": dijkstra,
+    "A*": astar,
+    "JPS": jps,
+    "Bi-Dijkstra": biDijkstra,
+    "Bi-A*": biAstar,
+    "Dial": dial,
+    "D* Lite": dstarLite,
+    "HPA*": hpaStar,
+}
+if wavefront is not None:
+    ALGORITHMS["Wavefront"] = wavefront
+
+
+def solve(grid, start, end, algorithm="A*", prune=True, cache=False):
+    """Search from ``start`` to ``end`` (``(row, col)`` pairs) and return a ``SearchResult``.
+
+    With ``prune``, queries whose ends lie in different regions return an empty
+    result at once (``stats["unreachable"]``) instead of exhausting the search.
+    With ``cache``, a query already answered on the unchanged grid is returned from
+    ``querycache.queryCache(grid)`` (``stats["cached"]``) instead of searched again.
+    """
+    search = ALGORITHMS[algorithm]
+    t0 = time.perf_counter()
+    s, e = grid.index(*start), grid.index(*end)
+    hit = queryCache(grid).get(s, e, algorithm) if cache else None
+    if hit is not None:
+        result = SearchResult(hit[0].path, dict(hit[0].stats, cached=True))
+    elif prune and not connected(grid, s, e):
+        result = SearchResult([], {"expanded": 0, "unreachable": True})
+    else:
+        result = run(search(grid, s, e))
+        if cache: queryCache(grid).put(s, e, algorithm, result)
+    result.stats["time"] = time.perf_counter() - t0
+    return result
+
+
+def record(grid, start, end, search):
+    """Run ``search`` between flat indices with tracing on, at full speed.
+
+    Returns ``(result, cells, states)`` where the events are packed into an
+    ``array('i')`` of cell indices and a ``bytearray`` of states, ready to replay.
+    Everything is picklable; process-pool workers run it through ``recordShared``.
+    """
+    cells, states = array("i"), bytearray()
+    trace = Trace(search(grid, start, end, trace=True))
+    t0 = time.perf_counter()
+    for idx, state in trace:
+        cells.append(idx)
+        states.append(state)
+    result = trace.result
+    result.stats["time"] = time.perf_counter() - t0
+    return result, cells, states
+
+
+# === SHARED GRIDS ===
+def shareGrid(grid):
+    """Copy ``grid``'s layout into a new shared memory block; returns the block and the key workers open it by.
+
+    The caller closes and unlinks the block once the workers are done with it.
+    """
+    size = grid.width * grid.height
+    weighted = grid.weights is not None
+    memory = shared_memory.SharedMemory(create=True, size=max(1, size * (2 if weighted else 1)))
+    try:
+        memory.buf[:size] = grid.cells
+        if weighted: memory.buf[size:2 * size] = grid.weights
+    except BaseException:
+        memory.close()
+        memory.unlink()
+        raise
+    return memory, (memory.name, grid.width, grid.height, weighted)
+
+
+sharedKey = sharedGrid = None  # per worker process: the last shared layout opened, copied into a Grid of its own
+
+def recordShared(key, start, end, search):
+    """``record`` on a grid from ``shareGrid``; each worker copies the layout out once per block, not once per job."""
+    global sharedKey, sharedGrid
+    if key != sharedKey:
+        name, width, height, weighted = key
+        memory = shared_memory.SharedMemory(name=name)
+        size = width * height
+        cells = bytearray(memory.buf[:size])
+        weights = bytearray(memory.buf[size:2 * size]) if weighted else None
+        memory.close()
+        sharedKey, sharedGrid = key, Grid(width, height, cells, weights)
+    return record(sharedGrid, start, end, search)
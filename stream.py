@@ -0,0 +1,78 @@
+"""Run a traced search on a background thread and stream its events through a bounded queue.
+
+The worker packs events into batches of ``BATCH`` (an ``array('i')`` of cells and a
+``bytearray`` of states) and queues them; ``None`` marks the end, after which ``result``
+holds the ``SearchResult``. The queue holds at most ``DEPTH`` batches, so a consumer
+that stops taking them (paused, say) stalls the search instead of buffering it all.
+``searchNs`` is the time spent inside the search generator, measured on the worker.
+
+``cancel`` stops the worker at its next batch and closes the search generator, so a
+search that keeps state between runs (D* Lite) can drop what it left half-done. An
+exception in the search ends the stream as well and is kept in ``error``.
+
+The grid must not change while the search runs.
+"""
+
+import queue
+import threading
+import time
+from array import array
+
+from search import Trace
+
+BATCH = 512
+DEPTH = 64
+
+
+class SearchStream:
+    def __init__(self, search, grid, start, end, batch=BATCH, depth=DEPTH):
+        self.queue = queue.Queue(depth)
+        self.cancelled = threading.Event()
+        self.result = self.error = None
+        self.searchNs = 0
+        self.thread = threading.Thread(target=self.work, args=(search, grid, start, end, batch), daemon=True)
+        self.thread.start()
+
+    def work(self, search, grid, start, end, batch):
+        trace = Trace(search(grid, start, end, trace=True))
+        events = iter(trace)
+        clock = time.perf_counter_ns
+        cells, states = array("i"), bytearray()
+        t = clock()
+        try:
+            for idx, state in events:
+                cells.append(idx)
+                states.append(state)
+                if len(cells) >= batch:
+                    self.searchNs += clock() - t
+                    if not self.put((cells, states)):
+                        events.close()
+                        return
+                    cells, states = array("i"), bytearray()
+                    t = clock()
+        except Exception as error:
+            self.error = error
+            self.put(None)
+            return
+        self.searchNs += clock() - t
+        self.result = trace.result
+        if self.put((cells, states)):
+            self.put(None)
+
+    def put(self, item):
+        # wait for room, but give up once cancelled
+        while not self.cancelled.is_set():
+            try:
+                self.queue.put(item, timeout=0.05)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def take(self):
+        """The next batch if one is ready: ``(cells, states)``, ``None`` at the end, else raises ``queue.Empty``."""
+        return self.queue.get_nowait()
+
+    def cancel(self):
+        self.cancelled.set()
+        self.thread.join()
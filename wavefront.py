@@ -0,0 +1,112 @@
+"""Vectorized breadth-first wavefront for unit-cost grids (needs NumPy).
+
+On a unit-cost grid Dijkstra settles cells in breadth-first layers, so the whole
+frontier can be expanded at once: shift its flat indices by +width, -width, +1 and
+-1, and keep the cells the barrier mask and the visited mask leave free. The grid is
+padded with a ring of barriers, so shifting by one never wraps onto the next row.
+No parent array is kept: the path is walked back from ``end`` through neighbours
+whose distance is one less, which is cheaper than writing a direction per cell.
+
+``flood`` returns the full distance field; ``wavefront`` is the usual search generator
+and stops after the layer that reaches ``end``.
+"""
+
+import numpy as np
+
+from grid import BARRIER, OPEN, CLOSED, PATH
+from search import SearchResult, dial
+
+
+class Flood:
+    """Layer-by-layer expansion state over the padded grid."""
+
+    def __init__(self, grid, start):
+        if not grid.isUniform():
+            raise ValueError("the wavefront only handles unit-cost grids")
+        self.width, self.height = grid.width, grid.height
+        pw = self.padWidth = grid.width + 2
+        blocked = np.ones((grid.height + 2, pw), dtype=bool)
+        blocked[1:-1, 1:-1] = np.frombuffer(grid.cells, dtype=np.uint8).reshape(grid.height, grid.width) == BARRIER
+        self.closed = blocked.ravel()  # barriers and every cell reached so far
+        self.dist = np.full(self.closed.size, -1, dtype=np.int32)
+        self.shifts = (pw, -pw, 1, -1)  # down, up, right, left, as in Grid.neighbors
+
+        origin = self.padded(start)
+        self.frontier = np.array([origin], dtype=np.intp) if not self.closed[origin] else np.empty(0, dtype=np.intp)
+        self.closed[origin] = True
+        self.dist[origin] = 0
+        self.layers = 0
+        self.expanded = self.peak = 0
+
+    def padded(self, idx):
+        row, col = divmod(idx, self.width)
+        return (row + 1) * self.padWidth + col + 1
+
+    def unpadded(self, cells):
+        return (cells // self.padWidth - 1) * self.width + cells % self.padWidth - 1
+
+    def step(self):
+        """Expand the current frontier; returns the cells it opened (padded indices)."""
+        frontier, closed = self.frontier, self.closed
+        self.expanded += frontier.size
+        self.layers += 1
+        opened = []
+        for shift in self.shifts:
+            cells = frontier + shift
+            cells = cells[~closed[cells]]  # unique: each direction maps the frontier one-to-one
+            closed[cells] = True
+            opened.append(cells)
+        self.frontier = np.concatenate(opened)
+        self.dist[self.frontier] = self.layers
+        self.peak = max(self.peak, self.frontier.size)
+        return self.frontier
+
+    def grid2d(self, values):
+        return values.reshape(self.height + 2, self.padWidth)[1:-1, 1:-1]
+
+    def path(self, end):
+        dist, idx = self.dist, self.padded(end)
+        if dist[idx] < 0: return []
+        path = [idx]
+        for d in range(int(dist[idx]) - 1, -1, -1):
+            idx = next(idx - shift for shift in self.shifts if dist[idx - shift] == d)
+            path.append(idx)
+        path.reverse()
+        return self.unpadded(np.array(path, dtype=np.intp)).tolist()
+
+    def stats(self):
+        return {"expanded": self.expanded, "layers": self.layers, "peakOpen": self.peak}
+
+
+def flood(grid, start, end=-1):
+    """Steps from flat index ``start`` to every reachable cell, plus the path to ``end`` if given.
+
+    Returns ``(dist, path)``: ``dist`` is a ``(height, width)`` int32 array with -1
+    for barriers and unreachable cells, ``path`` a list of flat indices (empty when
+    ``end`` is unreachable or not given).
+    """
+    state = Flood(grid, start)
+    while state.frontier.size:
+        state.step()
+    return state.grid2d(state.dist).copy(), state.path(end) if end >= 0 else []
+
+
+def wavefront(grid, start, end, trace=False):
+    if not grid.isUniform():  # layers are only shortest on unit costs
+        return (yield from dial(grid, start, end, trace))
+    state = Flood(grid, start)
+    target = state.padded(end)
+    while state.frontier.size and not state.closed[target]:
+        expanding = state.frontier
+        opened = state.step()
+        if trace:
+            for idx in state.unpadded(opened).tolist():
+                yield idx, OPEN
+            for idx in state.unpadded(expanding).tolist():
+                yield idx, CLOSED
+
+    path = state.path(end)
+    if trace:
+        for idx in reversed(path[1:-1]):
+            yield idx, PATH
+    return SearchResult(path, state.stats())